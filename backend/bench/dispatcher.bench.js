@@ -0,0 +1,224 @@
+// Memory use and dispatch latency of the reminder dispatcher at 100k schedules,
+// against the previous one-node-cron-job-per-schedule approach.
+//
+//   npm run bench:dispatch
+//   node --expose-gc bench/dispatcher.bench.js --schedules 100000 --db-ms 2 --send-ms 0
+//   node --expose-gc bench/dispatcher.bench.js --mongo mongodb://localhost:27017/reminder_bench
+//
+// By default the database is an in-memory stand-in for the Schedule model
+// (find().select().lean() and bulkWrite) that adds --db-ms per round trip.
+// With --mongo it uses a real MongoDB and the Schedule model instead.
+// Each mode runs in a child process so heap/RSS numbers don't mix. One
+// simulated day is replayed with a fake clock: every minute is one tick.
+// Results are printed as a table and written as JSON with --json.
+import { spawnSync } from "child_process";
+import { writeFileSync } from "fs";
+import { fileURLToPath } from "url";
+
+const args = Object.fromEntries(
+  process.argv.slice(2).reduce((acc, arg, i, all) => {
+    if (arg.startsWith("--")) acc.push([arg.slice(2), all[i + 1]?.startsWith("--") ? "1" : all[i + 1] ?? "1"]);
+    return acc;
+  }, [])
+);
+const N = Number(args.schedules ?? 100_000);
+const DB_MS = Number(args["db-ms"] ?? 2);
+const SEND_MS = Number(args["send-ms"] ?? 0);
+const MINUTE = 60_000;
+
+const sleep = (ms) => (ms > 0 ? new Promise((r) => setTimeout(r, ms)) : Promise.resolve());
+
+const mb = () => {
+  global.gc?.();
+  const m = process.memoryUsage();
+  return { heapMb: m.heapUsed / 1e6, rssMb: m.rss / 1e6 };
+};
+
+const percentile = (values, q) => {
+  const sorted = [...values].sort((a, b) => a - b);
+  return sorted[Math.min(sorted.length - 1, Math.floor(q * sorted.length))];
+};
+
+// half the reminders at the usual dose times, the rest spread over the day
+const makeSchedules = (n, seed = 42) => {
+  let x = seed;
+  const rand = () => ((x = (x * 1103515245 + 12345) % 2 ** 31) / 2 ** 31);
+  const hot = [[8, 0], [14, 0], [20, 0]];
+  return Array.from({ length: n }, (_, i) => {
+    const [h, m] = rand() < 0.5 ? hot[Math.floor(rand() * hot.length)] : [Math.floor(rand() * 24), Math.floor(rand() * 60)];
+    return {
+      _id: `s${i}`,
+      chatId: String(100000 + (i % 5000)),
+      medicine: "Medicine",
+      message: "Medicine time reminder",
+      cronTime: `${m} ${h} * * *`,
+      time: `${h}:${m}`,
+      duration: 30,
+      remainingRuns: 1 + Math.floor(rand() * 30),
+      active: true,
+    };
+  });
+};
+
+// in-memory stand-in for the mongoose Schedule model
+class MemoryScheduleModel {
+  constructor(docs, latencyMs) {
+    this.docs = new Map(docs.map((d) => [d._id, { ...d }]));
+    this.latencyMs = latencyMs;
+    this.roundTrips = 0;
+  }
+
+  find(filter) {
+    return {
+      select: () => ({
+        lean: async () => {
+          this.roundTrips++;
+          await sleep(this.latencyMs);
+          return [...this.docs.values()].filter((d) => d.active === filter.active);
+        },
+      }),
+    };
+  }
+
+  async bulkWrite(ops) {
+    this.roundTrips++;
+    await sleep(this.latencyMs);
+    for (const { updateMany } of ops) {
+      const { _id, remainingRuns } = updateMany.filter;
+      for (const id of _id.$in) {
+        const doc = this.docs.get(id);
+        if (!doc) continue;
+        if (remainingRuns.$gt !== undefined && !(doc.remainingRuns > remainingRuns.$gt)) continue;
+        if (remainingRuns.$lte !== undefined && !(doc.remainingRuns <= remainingRuns.$lte)) continue;
+        if (updateMany.update.$inc) doc.remainingRuns += updateMany.update.$inc.remainingRuns;
+        if (updateMany.update.$set) Object.assign(doc, updateMany.update.$set);
+      }
+    }
+  }
+}
+
+const runDispatcher = async () => {
+  const { ReminderDispatcher } = await import("../src/services/reminder.service.js");
+  const docs = makeSchedules(N);
+  let model;
+  if (args.mongo) {
+    const { default: mongoose } = await import("mongoose");
+    const { Schedule } = await import("../src/models/schedule.model.js");
+    await mongoose.connect(args.mongo);
+    await Schedule.deleteMany({});
+    await Schedule.insertMany(docs.map(({ _id, ...d }) => d), { lean: true });
+    model = Schedule;
+  } else {
+    model = new MemoryScheduleModel(docs, DB_MS);
+  }
+
+  // midnight IST of a fixed day, so runs are comparable
+  let clock = Date.UTC(2025, 0, 1) - 330 * MINUTE;
+  const before = mb();
+  const dispatcher = new ReminderDispatcher({
+    name: "bench",
+    model,
+    concurrency: 64,
+    now: () => clock,
+    send: () => sleep(SEND_MS),
+    log: { log() {}, error: console.error },
+  });
+  const loadStart = performance.now();
+  await dispatcher.load();
+  const loadMs = performance.now() - loadStart;
+  const loaded = mb();
+
+  const ticks = [];
+  for (let minute = 1; minute <= 24 * 60; minute++) {
+    clock += MINUTE;
+    const start = performance.now();
+    const { sent } = await dispatcher.tick(clock);
+    if (sent) ticks.push({ sent, ms: performance.now() - start });
+  }
+  const latencies = ticks.map((t) => t.ms);
+  const busiest = ticks.reduce((a, b) => (b.sent > a.sent ? b : a), { sent: 0, ms: 0 });
+  const result = {
+    mode: "dispatcher",
+    database: args.mongo ? "mongodb" : `memory (+${DB_MS} ms per round trip)`,
+    schedules: N,
+    timers: 1,
+    loadMs,
+    heapMb: loaded.heapMb - before.heapMb,
+    rssMb: loaded.rssMb,
+    reminders: ticks.reduce((a, t) => a + t.sent, 0),
+    ticksWithWork: ticks.length,
+    tickP50Ms: percentile(latencies, 0.5),
+    tickP99Ms: percentile(latencies, 0.99),
+    busiestTick: busiest,
+    dbRoundTrips: model.roundTrips ?? null,
+  };
+  if (args.mongo) {
+    const { default: mongoose } = await import("mongoose");
+    await mongoose.disconnect();
+  }
+  return result;
+};
+
+const runCron = async () => {
+  const { default: cron } = await import("node-cron");
+  const docs = makeSchedules(N);
+  const before = mb();
+  const loadStart = performance.now();
+  const jobs = docs.map((doc) => cron.schedule(doc.cronTime, () => {}, { timezone: "Asia/Kolkata" }));
+  const loadMs = performance.now() - loadStart;
+  const loaded = mb();
+  jobs.forEach((job) => job.stop());
+  // each fire did findById + save, plus another save on the last run
+  const fires = docs.length;
+  const finishing = docs.filter((d) => d.remainingRuns === 1).length;
+  return {
+    mode: "node-cron",
+    schedules: N,
+    timers: jobs.length,
+    loadMs,
+    heapMb: loaded.heapMb - before.heapMb,
+    rssMb: loaded.rssMb,
+    reminders: fires,
+    dbRoundTrips: 1 + fires * 2 + finishing,
+  };
+};
+
+const main = () => {
+  const results = [];
+  for (const mode of ["node-cron", "dispatcher"]) {
+    const child = spawnSync(
+      process.execPath,
+      ["--expose-gc", fileURLToPath(import.meta.url), ...process.argv.slice(2), "--child", mode],
+      { encoding: "utf8", maxBuffer: 1 << 24 }
+    );
+    if (child.status !== 0) {
+      console.error(`${mode} failed:\n${child.stderr}`);
+      continue;
+    }
+    results.push(JSON.parse(child.stdout.trim().split("\n").pop()));
+  }
+
+  const fmt = (v, digits = 1) => (v === undefined || v === null ? "-" : Number(v).toFixed(digits));
+  console.log(`schedules: ${N}, one simulated day\n`);
+  console.log("mode        timers   load ms   heap MB    rss MB  db trips  tick p50  tick p99  busiest tick");
+  for (const r of results) {
+    const busiest = r.busiestTick ? `${r.busiestTick.sent} in ${fmt(r.busiestTick.ms)} ms` : "-";
+    console.log(
+      `${r.mode.padEnd(10)} ${String(r.timers).padStart(7)} ${fmt(r.loadMs).padStart(9)} ${fmt(r.heapMb).padStart(9)} ` +
+        `${fmt(r.rssMb).padStart(9)} ${String(r.dbRoundTrips ?? "-").padStart(9)} ${fmt(r.tickP50Ms, 2).padStart(9)} ` +
+        `${fmt(r.tickP99Ms, 2).padStart(9)}  ${busiest}`
+    );
+  }
+  if (args.json) {
+    writeFileSync(args.json, JSON.stringify({ startedAt: new Date().toISOString(), node: process.version, results }, null, 2));
+    console.log(`\nresults saved to ${args.json}`);
+  }
+};
+
+if (args.child === "dispatcher") {
+  console.log(JSON.stringify(await runDispatcher()));
+} else if (args.child === "node-cron") {
+  console.log(JSON.stringify(await runCron()));
+} else {
+  main();
+}
@@ -1,5 +1,9 @@
 import { Schedule } from "../models/schedule.model.js";
-import { bot } from "../services/telegram.service.js";
+import {
+  bot,
+  startTelegramJobs,
+  cancelTelegramJob,
+} from "../services/telegram.service.js";
 
 //Example: { chatId, items:[{ medicine, times:[HH:mm,HH:mm], durationDays },{},{}] }
 const createFromPrescription = async (req, res) => {
@@ -10,9 +14,8 @@ const createFromPrescription = async (req, res) => {
     }
     const { chatId } = req.body;
 
-    const created = [];
-
     if (Array.isArray(req.body.items)) {
+      const docs = [];
       for (const it of req.body.items) {
         const medName = it.medicine || "Medicine";
         const medTimes = Array.isArray(it.times) ? it.times : [];
@@ -21,28 +24,34 @@ const createFromPrescription = async (req, res) => {
           const [hourStr, minuteStr] = String(t).split(":");
           const hour = Number(hourStr);
           const minute = Number(minuteStr);
-          const cronTime = `${minute} ${hour} * * *`;
-          const message = `${medName} time reminder`;
-          const doc = await Schedule.create({
+          docs.push({
             user: userId,
             chatId,
-            message,
-            cronTime,
+            medicine: medName,
+            message: `${medName} time reminder`,
+            cronTime: `${minute} ${hour} * * *`,
+            time: String(t),
+            duration: runs,
             remainingRuns: runs,
             active: true,
           });
-          // do not schedule cron jobs; send immediate confirmation via Telegram
-          try {
-            if (bot) {
-              await bot.sendMessage(chatId, `Reminder created: ${message}`);
-            }
-          } catch (e) {
-            // ignore send errors but record them
-            console.error("telegram send on create failed:", e?.message || e);
-          }
-          created.push(doc);
         }
       }
+
+      // one round trip for every schedule, then hand them to the dispatcher
+      const created = docs.length ? await Schedule.insertMany(docs) : [];
+      startTelegramJobs(created);
+
+      // a single confirmation listing everything that was scheduled
+      try {
+        if (bot && created.length) {
+          const lines = created.map((d) => `• ${d.message} at ${d.time}`);
+          await bot.sendMessage(chatId, `Reminders created:\n${lines.join("\n")}`);
+        }
+      } catch (e) {
+        // ignore send errors but record them
+        console.error("telegram send on create failed:", e?.message || e);
+      }
       return res.json({ success: true, count: created.length, data: created });
     }
   } catch (err) {
@@ -54,6 +63,7 @@ const deleteSchedule = async (req, res) => {
   try {
     const id = req.params.id;
     const doc = await Schedule.findByIdAndDelete(id);
+    cancelTelegramJob(id);
     res.json({
       success: true,
       message: doc ? "Schedule removed" : "Schedule not found",
@@ -1,5 +1,5 @@
 import { Schedule } from "../models/schedule.model.js";
-import { startTelegramJob } from "../services/telegram.service.js";
+import { startTelegramJobs } from "../services/telegram.service.js";
 
 export const createTelegramSchedules = async (req, res) => {
   try {
@@ -12,7 +12,8 @@ export const createTelegramSchedules = async (req, res) => {
     if (!Array.isArray(schedules) || schedules.length === 0)
       return res.status(400).json({ success: false, message: "schedules[] is required" });
 
-    const created = [];
+    // validate everything first, then insert in one round trip
+    const docs = [];
     for (const s of schedules) {
       const medicine = s.medicine || "Medicine";
       const [hh, mm] = String(s.time || "").split(":").map(n => parseInt(n, 10));
@@ -21,24 +22,21 @@ export const createTelegramSchedules = async (req, res) => {
       }
       const duration = parseInt(s.duration, 10) || 1;
 
-      const cronTime = `${mm} ${hh} * * *`;
-      const message = `${medicine} time reminder`;
-
-      const doc = await Schedule.create({
+      docs.push({
         user: userId,
         chatId,
         medicine,
-        message,
-        cronTime,
-        time: s.time,          // <-- add this
-        duration,              // <-- add this
+        message: `${medicine} time reminder`,
+        cronTime: `${mm} ${hh} * * *`,
+        time: s.time,
+        duration,
         remainingRuns: duration,
         active: true,
       });
-
-      await startTelegramJob(doc);
-      created.push(doc);
     }
+
+    const created = await Schedule.insertMany(docs);
+    startTelegramJobs(created);
     return res.json({ success: true, count: created.length, data: created });
   } catch (err) {
     console.error("[createTelegramSchedules ERROR]", err);
@@ -1,4 +1,5 @@
 import express from "express";
+import zlib from "zlib";
 
 const router = express.Router();
 
@@ -6,9 +7,27 @@ const router = express.Router();
 const MODEL_BASE = process.env.DISEASE_MODEL_BASE || "http://127.0.0.1:5001";
 const MODEL_URL = `${MODEL_BASE}/predict`;
 
+// Full symptom list, cached per model-server ETag: the envelope is serialized
+// and compressed once, and later calls only revalidate upstream (304).
+let symptomsCache = null; // { etag, json, gzip, br }
+
+function sendSymptoms(req, res, entry) {
+  res.set({ ETag: entry.etag, "Cache-Control": "no-cache", Vary: "Accept-Encoding" });
+  if (req.fresh) {
+    return res.status(304).end();
+  }
+  const encoding = req.acceptsEncodings("br", "gzip", "identity");
+  res.type("application/json");
+  if (encoding === "br" || encoding === "gzip") {
+    res.set("Content-Encoding", encoding);
+    return res.send(entry[encoding]);
+  }
+  return res.send(entry.json);
+}
+
 // POST /api/predict
 router.post("/predict", async (req, res) => {
-  const { symptoms } = req.body || {};
+  const { symptoms, top_k, min_probability, compact } = req.body || {};
 
   if (!symptoms || !Array.isArray(symptoms) || symptoms.length === 0) {
     return res
@@ -24,7 +43,7 @@ router.post("/predict", async (req, res) => {
     const r = await fetch(MODEL_URL, {
       method: "POST",
       headers: { "Content-Type": "application/json" },
-      body: JSON.stringify({ symptoms }),
+      body: JSON.stringify({ symptoms, top_k, min_probability, compact }),
       signal: controller.signal,
     });
     clearTimeout(timeout);
@@ -49,28 +68,93 @@ router.post("/predict", async (req, res) => {
   }
 });
 
+// POST /api/predict/batch -> scores several symptom lists in one model call
+router.post("/predict/batch", async (req, res) => {
+  const { items, top_k, min_probability, compact } = req.body || {};
+
+  if (!items || !Array.isArray(items) || items.length === 0) {
+    return res.status(400).json({ error: "items must be a non-empty array" });
+  }
+
+  try {
+    const controller = new AbortController();
+    const timeout = setTimeout(() => controller.abort(), 30_000);
+
+    const r = await fetch(`${MODEL_BASE}/predict/batch`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ items, top_k, min_probability, compact }),
+      signal: controller.signal,
+    });
+    clearTimeout(timeout);
+
+    if (!r.ok) {
+      const text = await r.text();
+      return res
+        .status(502)
+        .json({ error: "Model server error", detail: text });
+    }
+
+    const data = await r.json();
+    return res.json({ data });
+  } catch (err) {
+    if (err.name === "AbortError") {
+      return res.status(504).json({ error: "Model server timed out" });
+    }
+    return res
+      .status(500)
+      .json({ error: "Failed to contact model server", detail: String(err) });
+  }
+});
+
 // GET /api/predict/symptoms -> returns list of available symptoms from model server
+// GET /api/predict/symptoms?q=abd[&match=prefix|substring][&limit=20] -> autocomplete search
 router.get("/predict/symptoms", async (req, res) => {
+  const { q, match, limit } = req.query;
+  const search = q !== undefined;
   try {
     const controller = new AbortController();
     const timeout = setTimeout(() => controller.abort(), 5_000);
 
-    const r = await fetch(`${MODEL_BASE}/symptoms`, {
+    const params = new URLSearchParams();
+    if (search) {
+      params.set("q", String(q));
+      if (match) params.set("match", String(match));
+      if (limit) params.set("limit", String(limit));
+    }
+    const headers = { Accept: "application/json" };
+    if (!search && symptomsCache) headers["If-None-Match"] = symptomsCache.etag;
+
+    const r = await fetch(`${MODEL_BASE}/symptoms${search ? `?${params}` : ""}`, {
       method: "GET",
-      headers: { Accept: "application/json" },
+      headers,
       signal: controller.signal,
     });
     clearTimeout(timeout);
 
+    if (!search && r.status === 304 && symptomsCache) {
+      return sendSymptoms(req, res, symptomsCache);
+    }
     if (!r.ok) {
       const text = await r.text();
       return res
-        .status(502)
+        .status(r.status === 400 ? 400 : 502)
         .json({ error: "Model server error", detail: text });
     }
 
     const data = await r.json();
-    return res.json({ data });
+    const etag = r.headers.get("etag");
+    if (search || !etag) {
+      return res.json({ data });
+    }
+    const json = Buffer.from(JSON.stringify({ data }));
+    symptomsCache = {
+      etag,
+      json,
+      gzip: zlib.gzipSync(json),
+      br: zlib.brotliCompressSync(json),
+    };
+    return sendSymptoms(req, res, symptomsCache);
   } catch (err) {
     if (err.name === "AbortError") {
       return res.status(504).json({ error: "Model server timed out" });
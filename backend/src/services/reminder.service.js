@@ -0,0 +1,362 @@
+import { Schedule } from "../models/schedule.model.js";
+
+// One timer for all reminders: schedules sit in per-minute buckets, and a
+// min-heap of bucket times decides when the single setTimeout fires. Each
+// tick sends everything due (bounded concurrency) and then decrements
+// remainingRuns for every sent reminder in one bulkWrite. Decrements whose
+// write failed are kept and retried with the next tick's write.
+
+const MINUTE = 60_000;
+const MAX_DELAY = 60 * MINUTE; // setTimeout overflows past ~24.8 days; re-arm hourly
+// cron expressions are evaluated at a fixed UTC offset (default IST, +05:30)
+const TZ_OFFSET_MINUTES = Number(process.env.REMINDER_TZ_OFFSET_MINUTES ?? 330);
+
+// --- cron ---
+const FIELDS = [
+  ["minute", 0, 59],
+  ["hour", 0, 23],
+  ["dayOfMonth", 1, 31],
+  ["month", 1, 12],
+  ["dayOfWeek", 0, 7],
+];
+
+const parseField = (text, min, max) => {
+  const values = new Set();
+  for (const part of text.split(",")) {
+    const [range, stepText] = part.split("/");
+    const step = stepText === undefined ? 1 : Number(stepText);
+    let lo = min;
+    let hi = max;
+    if (range !== "*") {
+      [lo, hi] = range.split("-").map(Number);
+      if (hi === undefined) hi = stepText === undefined ? lo : max;
+    }
+    if (![lo, hi, step].every(Number.isInteger) || lo < min || hi > max || lo > hi || step < 1) {
+      throw new Error(`invalid cron field "${text}"`);
+    }
+    for (let v = lo; v <= hi; v += step) values.add(v);
+  }
+  return values;
+};
+
+// "m h dom mon dow" (a leading seconds field, as node-cron allows, is ignored)
+export const parseCron = (expr) => {
+  let parts = String(expr).trim().split(/\s+/);
+  if (parts.length === 6) parts = parts.slice(1);
+  if (parts.length !== 5) throw new Error(`invalid cron expression "${expr}"`);
+  const spec = {};
+  FIELDS.forEach(([name, min, max], i) => {
+    spec[name] = parseField(parts[i], min, max);
+  });
+  if (spec.dayOfWeek.delete(7)) spec.dayOfWeek.add(0);
+  spec.anyDayOfMonth = parts[2] === "*";
+  spec.anyDayOfWeek = parts[4] === "*";
+  return spec;
+};
+
+const dayMatches = (spec, d) => {
+  const dom = spec.dayOfMonth.has(d.getUTCDate());
+  const dow = spec.dayOfWeek.has(d.getUTCDay());
+  // cron: when both are restricted, either one matching is enough
+  if (!spec.anyDayOfMonth && !spec.anyDayOfWeek) return dom || dow;
+  return dom && dow;
+};
+
+// first matching minute strictly after `fromMs`, as epoch ms (null if none within ~5 years)
+export const nextFireTime = (spec, fromMs, offsetMinutes = TZ_OFFSET_MINUTES) => {
+  const shift = offsetMinutes * MINUTE;
+  let t = Math.floor((fromMs + shift) / MINUTE) * MINUTE + MINUTE;
+  const limit = t + 5 * 366 * 24 * 60 * MINUTE;
+  while (t < limit) {
+    const d = new Date(t);
+    const y = d.getUTCFullYear();
+    const m = d.getUTCMonth();
+    if (!spec.month.has(m + 1)) {
+      t = Date.UTC(y, m + 1, 1);
+    } else if (!dayMatches(spec, d)) {
+      t = Date.UTC(y, m, d.getUTCDate() + 1);
+    } else if (!spec.hour.has(d.getUTCHours())) {
+      t = Date.UTC(y, m, d.getUTCDate(), d.getUTCHours() + 1);
+    } else if (!spec.minute.has(d.getUTCMinutes())) {
+      t += MINUTE;
+    } else {
+      return t - shift;
+    }
+  }
+  return null;
+};
+
+// --- min-heap of bucket times ---
+class MinHeap {
+  constructor() {
+    this.items = [];
+  }
+
+  get size() {
+    return this.items.length;
+  }
+
+  peek() {
+    return this.items[0];
+  }
+
+  push(value) {
+    const a = this.items;
+    a.push(value);
+    let i = a.length - 1;
+    while (i > 0) {
+      const parent = (i - 1) >> 1;
+      if (a[parent] <= a[i]) break;
+      [a[parent], a[i]] = [a[i], a[parent]];
+      i = parent;
+    }
+  }
+
+  pop() {
+    const a = this.items;
+    const top = a[0];
+    const last = a.pop();
+    if (a.length) {
+      a[0] = last;
+      let i = 0;
+      for (;;) {
+        const l = 2 * i + 1;
+        const r = l + 1;
+        let min = i;
+        if (l < a.length && a[l] < a[min]) min = l;
+        if (r < a.length && a[r] < a[min]) min = r;
+        if (min === i) break;
+        [a[min], a[i]] = [a[i], a[min]];
+        i = min;
+      }
+    }
+    return top;
+  }
+}
+
+const mapLimit = async (items, limit, fn) => {
+  let next = 0;
+  const worker = async () => {
+    while (next < items.length) {
+      const item = items[next++];
+      await fn(item);
+    }
+  };
+  await Promise.all(Array.from({ length: Math.min(limit, items.length) }, worker));
+};
+
+// --- dispatcher ---
+export class ReminderDispatcher {
+  constructor({
+    name = "reminders",
+    send,
+    model = Schedule,
+    concurrency = 16,
+    offsetMinutes = TZ_OFFSET_MINUTES,
+    now = Date.now,
+    log = console,
+  }) {
+    this.name = name;
+    this.send = send;
+    this.model = model;
+    this.concurrency = concurrency;
+    this.offsetMinutes = offsetMinutes;
+    this.now = now;
+    this.log = log;
+    this.entries = new Map(); // id -> { id, chatId, message, cronTime, remainingRuns, next }
+    this.buckets = new Map(); // fire minute (ms) -> [id]
+    this.heap = new MinHeap();
+    // most schedules share a handful of cron expressions: parse each once, and
+    // compute each one's next fire time once per "from" minute
+    this.specs = new Map(); // cronTime -> parsed spec
+    this.nextFrom = null;
+    this.nextTimes = new Map(); // cronTime -> next fire time after nextFrom
+    this.unsaved = new Map(); // id -> sends not yet written to the database
+    this.timer = null;
+    this.running = false;
+    this.ticking = false;
+  }
+
+  // load every active schedule (lean documents, only the fields we need)
+  async load() {
+    const docs = await this.model
+      .find({ active: true })
+      .select("chatId message cronTime remainingRuns")
+      .lean();
+    for (const doc of docs) this.add(doc, { arm: false });
+    this.arm();
+    this.log.log(`[${this.name}] loaded ${this.entries.size} active schedules`);
+    return this.entries.size;
+  }
+
+  add(doc, { arm = true } = {}) {
+    const id = String(doc._id);
+    const cronTime = String(doc.cronTime);
+    if (!this.specs.has(cronTime)) {
+      try {
+        this.specs.set(cronTime, parseCron(cronTime));
+      } catch (err) {
+        this.log.error(`[${this.name}] skipped schedule ${id}: ${err.message}`);
+        return false;
+      }
+    }
+    const entry = {
+      id,
+      chatId: doc.chatId,
+      message: doc.message,
+      cronTime,
+      remainingRuns: doc.remainingRuns ?? 1,
+      next: null,
+    };
+    // replaces any earlier entry for the same id. Its old bucket slot is skipped
+    // by tick, or, when it is the same minute, collapsed with the new one.
+    this.entries.set(id, entry);
+    this.place(entry, this.now());
+    if (arm) this.arm();
+    return true;
+  }
+
+  remove(id) {
+    return this.entries.delete(String(id));
+  }
+
+  place(entry, fromMs) {
+    const from = Math.floor(fromMs / MINUTE);
+    if (from !== this.nextFrom) {
+      this.nextFrom = from;
+      this.nextTimes.clear();
+    }
+    let next = this.nextTimes.get(entry.cronTime);
+    if (next === undefined) {
+      next = nextFireTime(this.specs.get(entry.cronTime), fromMs, this.offsetMinutes);
+      this.nextTimes.set(entry.cronTime, next);
+    }
+    entry.next = next;
+    if (entry.next === null) {
+      this.entries.delete(entry.id);
+      return;
+    }
+    const bucket = this.buckets.get(entry.next);
+    if (bucket) {
+      bucket.push(entry.id);
+    } else {
+      this.buckets.set(entry.next, [entry.id]);
+      this.heap.push(entry.next);
+    }
+  }
+
+  start() {
+    this.running = true;
+    this.arm();
+  }
+
+  stop() {
+    this.running = false;
+    clearTimeout(this.timer);
+    this.timer = null;
+  }
+
+  arm() {
+    if (!this.running || this.ticking) return;
+    clearTimeout(this.timer);
+    this.timer = null;
+    if (!this.heap.size) return;
+    const delay = Math.min(Math.max(0, this.heap.peek() - this.now()), MAX_DELAY);
+    this.timer = setTimeout(() => this.run(), delay);
+  }
+
+  async run() {
+    this.ticking = true;
+    try {
+      await this.tick();
+    } catch (err) {
+      this.log.error(`[${this.name}] tick failed:`, err.message);
+    } finally {
+      this.ticking = false;
+      this.arm();
+    }
+  }
+
+  // send everything due at `now`, then one bulkWrite for the sent reminders
+  async tick(now = this.now()) {
+    // a Set: an id re-added for the same minute sits in its bucket twice
+    const dueSet = new Set();
+    while (this.heap.size && this.heap.peek() <= now) {
+      const at = this.heap.pop();
+      for (const id of this.buckets.get(at)) {
+        const entry = this.entries.get(id);
+        if (entry && entry.next === at) dueSet.add(entry);
+      }
+      this.buckets.delete(at);
+    }
+    if (!dueSet.size) return { due: 0, sent: 0 };
+    const due = [...dueSet];
+
+    const sent = [];
+    await mapLimit(due, this.concurrency, async (entry) => {
+      if (!entry.chatId) {
+        this.log.log(`[${this.name}] skipped: missing chatId for schedule ${entry.id}`);
+        return;
+      }
+      try {
+        await this.send(entry.chatId, entry.message);
+        sent.push(entry.id);
+        entry.remainingRuns -= 1;
+      } catch (err) {
+        this.log.error(`[${this.name}] send failed:`, err.message);
+      }
+    });
+
+    // failed sends are retried at the next occurrence, finished ones dropped
+    for (const entry of due) {
+      if (this.entries.get(entry.id) !== entry) continue; // removed meanwhile
+      if (entry.remainingRuns <= 0) this.entries.delete(entry.id);
+      else this.place(entry, Math.max(now, entry.next));
+    }
+
+    for (const id of sent) this.unsaved.set(id, (this.unsaved.get(id) ?? 0) + 1);
+    if (this.unsaved.size) await this.save();
+    this.log.log(`[${this.name}] sent ${sent.length}/${due.length} reminders`);
+    return { due: due.length, sent: sent.length };
+  }
+
+  // write the pending decrements (grouped by size) and deactivations in one bulkWrite
+  async save() {
+    const pending = this.unsaved;
+    this.unsaved = new Map();
+    const byCount = new Map(); // decrement -> [id]
+    for (const [id, n] of pending) {
+      if (!n) continue;
+      if (byCount.has(n)) byCount.get(n).push(id);
+      else byCount.set(n, [id]);
+    }
+    const groups = [...byCount];
+    const ops = groups.map(([n, ids]) => ({
+      updateMany: {
+        filter: { _id: { $in: ids }, remainingRuns: { $gt: 0 } },
+        update: { $inc: { remainingRuns: -n } },
+      },
+    }));
+    ops.push({
+      updateMany: {
+        filter: { _id: { $in: [...pending.keys()] }, remainingRuns: { $lte: 0 } },
+        update: { $set: { active: false } },
+      },
+    });
+    try {
+      await this.model.bulkWrite(ops, { ordered: true });
+    } catch (err) {
+      // ordered: the ops before the failing one were applied; keep the rest.
+      // Deactivation is idempotent, so every pending id stays queued for it.
+      const applied = err.writeErrors?.[0]?.index ?? 0;
+      for (const id of pending.keys()) this.unsaved.set(id, this.unsaved.get(id) ?? 0);
+      for (const [n, ids] of groups.slice(applied)) {
+        for (const id of ids) this.unsaved.set(id, this.unsaved.get(id) + n);
+      }
+      this.log.error(
+        `[${this.name}] saving ${pending.size} reminders failed, retrying with the next tick:`,
+        err.message
+      );
+    }
+  }
+}
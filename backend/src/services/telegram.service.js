@@ -1,10 +1,14 @@
 import TelegramBot from "node-telegram-bot-api";
-import cron from "node-cron";
-import { Schedule } from "../models/schedule.model.js";
+import { ReminderDispatcher } from "./reminder.service.js";
 
 // --- Initialize Telegram Bot ---
 export const bot = new TelegramBot(process.env.TELEGRAM_BOT_TOKEN, { polling: true });
-const jobs = {};
+
+// one timer for every reminder instead of a cron job per schedule
+const dispatcher = new ReminderDispatcher({
+  name: "telegram",
+  send: (chatId, message) => bot.sendMessage(chatId, message),
+});
 
 // --- Main Setup Function ---
 export const telegramSetup = async () => {
@@ -16,39 +20,15 @@ export const telegramSetup = async () => {
   });
 
   // Load all active schedules from DB on startup
-  const schedules = await Schedule.find({ active: true });
-  schedules.forEach((doc) => startTelegramJob(doc));
-  console.log(`[telegram] loaded ${schedules.length} active schedules`);
+  await dispatcher.load();
+  dispatcher.start();
 };
 
-// --- Start a New Reminder Job ---
-export const startTelegramJob = async (doc) => {
-  const id = String(doc._id);
-  if (jobs[id]) jobs[id].stop(); // Clear previous job if exists
-
-  const job = cron.schedule(doc.cronTime, async () => {
-    try {
-      await bot.sendMessage(doc.chatId, doc.message);
-      console.log(`[telegram] sent reminder to ${doc.chatId}`);
-
-      // Decrease remaining runs & deactivate if done
-      doc.remainingRuns = Math.max(0, (doc.remainingRuns || 1) - 1);
-      await doc.save();
-
-      if (doc.remainingRuns <= 0) {
-        job.stop();
-        doc.active = false;
-        await doc.save();
-        delete jobs[id];
-        console.log(`[telegram] completed and stopped job ${id}`);
-      }
-    } catch (err) {
-      console.error("[telegram] send failed:", err.message);
-    }
-  },{
-  timezone: "Asia/Kolkata"
-});
+// --- Start (or replace) reminders for new schedules ---
+export const startTelegramJob = (doc) => dispatcher.add(doc);
 
-  jobs[id] = job;
-  return job;
+export const startTelegramJobs = (docs) => {
+  for (const doc of docs) dispatcher.add(doc);
 };
+
+export const cancelTelegramJob = (id) => dispatcher.remove(id);
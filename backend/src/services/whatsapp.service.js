@@ -1,12 +1,16 @@
-import cron from "node-cron";
 import qrcode from "qrcode-terminal";
 import pkg from "whatsapp-web.js";
-import { Schedule } from "../models/schedule.model.js";
+import { ReminderDispatcher } from "./reminder.service.js";
 
 const { Client, LocalAuth } = pkg;
-const jobs = {};
 let client;
 
+// one timer for every reminder instead of a cron job per schedule
+const dispatcher = new ReminderDispatcher({
+  name: "whatsapp",
+  send: (chatId, message) => client.sendMessage(chatId, message),
+});
+
 const whatsappSetup = () => {
   if (client) return client;
 
@@ -33,54 +37,17 @@ const whatsappSetup = () => {
 };
 
 const loadAllSchedules = async () => {
-  const schedules = await Schedule.find({ active: true });
-  schedules.forEach(scheduleMessage);
-  console.log(`Loaded ${schedules.length} active schedules`);
+  await dispatcher.load();
+  dispatcher.start();
 };
 
 // Note: schedules now store `chatId` directly (e.g. "919876543210@c.us").
 // The schedule creator must provide a valid chatId. We no longer resolve phone numbers here.
 
-const scheduleMessage = (doc) => {
-  const id = String(doc._id);
-
-  const job = cron.schedule(doc.cronTime, async () => {
-    try {
-      const chatId = doc.chatId;
-      if (!chatId) {
-        console.log(`Skipped: missing chatId for schedule ${id}`);
-        return;
-      }
-
-      await client.sendMessage(chatId, doc.message);
-      console.log(`Sent to ${chatId}`);
-
-      const updatedSchedule = await Schedule.findById(doc._id);
-      updatedSchedule.remainingRuns--;
-      await updatedSchedule.save();
-
-      if (updatedSchedule.remainingRuns === 0) {
-        updatedSchedule.active = false;
-        await updatedSchedule.save();
-        if (jobs[id]) {
-          jobs[id].stop();
-          delete jobs[id];
-        }
-      }
-    } catch (err) {
-      console.error("Send failed:", err.message);
-    }
-  });
-
-  jobs[id] = job;
-  console.log(`Scheduled job for ${id} at cron: ${doc.cronTime}`);
-};
+const scheduleMessage = (doc) => dispatcher.add(doc);
 
 const cancelScheduleById = async (id) => {
-  if (jobs[id]) {
-    jobs[id].stop();
-    delete jobs[id];
-  }
+  dispatcher.remove(id);
 };
 
 export { whatsappSetup, scheduleMessage, loadAllSchedules, cancelScheduleById };
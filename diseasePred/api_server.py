@@ -1,174 +1,342 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-from typing import List
-import numpy as np
-import pandas as pd
-import pickle
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, Field
+from typing import Annotated, List, Optional
+import os
+import threading
+import time
+from starlette.concurrency import run_in_threadpool
+
+from inference import DiseaseModel, top_indices
+from metrics import Metrics, MetricsMiddleware
+from microbatch import MicroBatcher
+from prediction_cache import PredictionCache
+from symptom_catalog import SymptomCatalog
 
 app = FastAPI(title="CURE-BOT Disease Prediction API")
 
+# per-stage timings and counters, served as Prometheus text on /metrics
+METRICS = Metrics()
+# opt-in stack sampling: a fraction of requests, and/or requests sent with "X-Profile: 1"
+app.add_middleware(
+    MetricsMiddleware,
+    metrics=METRICS,
+    profile_dir=os.getenv("PROFILE_DIR", "profiles"),
+    profile_rate=float(os.getenv("PROFILE_SAMPLE_RATE", "0")),
+    profile_header=os.getenv("PROFILE_HEADER_ENABLED", "0") == "1",
+    profile_interval=float(os.getenv("PROFILE_INTERVAL_MS", "5")) / 1000.0,
+)
+
+
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "1024"))
+# symptoms per prediction; longer lists are rejected before any lookup
+MAX_SYMPTOMS = int(os.getenv("MAX_SYMPTOMS", "64"))
+SymptomList = Annotated[List[str], Field(max_length=MAX_SYMPTOMS)]
+ColumnList = Annotated[List[int], Field(max_length=MAX_SYMPTOMS)]
+
+# LRU/TTL cache of class probabilities keyed on the canonical symptom set
+CACHE = PredictionCache(
+    maxsize=int(os.getenv("PREDICTION_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("PREDICTION_CACHE_TTL", "3600")),
+)
+# how often (seconds) to stat the model artifact for changes
+MODEL_CHECK_INTERVAL = float(os.getenv("MODEL_CHECK_INTERVAL", "5"))
+DISEASE_MODEL = None
+SYMPTOM_CATALOG = None
+MODEL_STAMP = None
+# (model, stamp), swapped as one object so a request never pairs a model with
+# another model's stamp; the stamp is part of every cache key
+SERVING = (None, None)
+MODEL_LOADED_AT = None
+_last_model_check = 0.0
+_reload_lock = threading.Lock()
+
+# opt-in micro-batching of concurrent /predict calls
+MICROBATCH_ENABLED = os.getenv("MICROBATCH_ENABLED", "0") == "1"
+MICROBATCH_WINDOW_MS = float(os.getenv("MICROBATCH_WINDOW_MS", "2"))
+MICROBATCH_MAX_SIZE = int(os.getenv("MICROBATCH_MAX_SIZE", "64"))
+BATCHER = None
+
 
 class PredictRequest(BaseModel):
-    symptoms: List[str]
+    symptoms: SymptomList
+    top_k: int = 3
+    min_probability: float = 0.0
+    compact: bool = False
+
+
+class PredictBatchRequest(BaseModel):
+    # either symptom names per item, or pre-resolved sparse rows:
+    # column indices into the /symptoms list
+    items: List[SymptomList] = []
+    columns: List[ColumnList] = []
+    top_k: int = 3
+    min_probability: float = 0.0
+    compact: bool = False
 
 
 @app.on_event("startup")
+def startup_load():
+    # a preloading parent (serve.py) has already loaded the model before fork
+    if MODEL_LOADED_AT is None:
+        load_resources()
+
+
 def load_resources():
-    global MODEL, LABEL_ENCODER, SYMPTOMS_LIST, DISEASE_INFO, ACCURACY
-    with open("disease_prediction_catboost_hybrid.pkl", "rb") as f:
-        data = pickle.load(f)
-    MODEL = data["model"]
-    LABEL_ENCODER = data["label_encoder"]
-    SYMPTOMS_LIST = data["symptoms"]
-    ACCURACY = data.get("accuracy", None)
-
-    # load disease info for metadata
-    df = pd.read_csv("disease_list_with_counts.csv")
-    df.columns = [c.strip() for c in df.columns]
-
-    # compute Severity and Specialist mapping (keep same logic as Streamlit app)
-    df["Severity"] = np.where(
-        df["Disease"].str.lower().isin(
-            ["heart attack", "stroke", "cancer", "kidney failure", "liver cirrhosis", "covid-19", "pneumonia"]
-        ),
-        "Severe",
-        np.where(
-            df["Disease"].str.lower().isin(
-                ["diabetes", "hypertension", "asthma", "arthritis", "tuberculosis", "depression"]
-            ),
-            "Moderate",
-            "Mild",
-        ),
-    )
-
-    mapping = {
-        'multiple sclerosis': 'Neurologist',
-        'neurosis': 'Psychiatrist',
-        'psychotic disorder': 'Psychiatrist',
-        'personality disorder': 'Psychiatrist',
-        'panic disorder': 'Psychiatrist',
-        'acute stress reaction': 'Psychiatrist',
-        'anxiety': 'Psychiatrist',
-        'complex regional pain syndrome': 'Neurologist',
-        'peripheral nerve disorder': 'Neurologist',
-        'concussion': 'Neurologist',
-        'developmental disability': 'Neurologist',
-        'heart attack': 'Cardiologist',
-        'heart failure': 'Cardiologist',
-        'hypertensive heart disease': 'Cardiologist',
-        'angina': 'Cardiologist',
-        'sinus bradycardia': 'Cardiologist',
-        'asthma': 'Pulmonologist',
-        'chronic obstructive pulmonary disease (copd)': 'Pulmonologist',
-        'acute bronchitis': 'Pulmonologist',
-        'acute bronchiolitis': 'Pulmonologist',
-        'pneumonia': 'Pulmonologist',
-        'acute bronchospasm': 'Pulmonologist',
-        'obstructive sleep apnea (osa)': 'Pulmonologist',
-        'croup': 'Pulmonologist',
-        'sickle cell crisis': 'Hematologist',
-        'sepsis': 'Infectious Disease Specialist',
-        'hypoglycemia': 'Endocrinologist',
-        'otitis media': 'ENT Specialist',
-        "otitis externa (swimmer's ear)": 'ENT Specialist',
-        'ear drum damage': 'ENT Specialist',
-        'eustachian tube dysfunction (ear disorder)': 'ENT Specialist',
-        'nose disorder': 'ENT Specialist',
-        'acute sinusitis': 'ENT Specialist',
-        'seasonal allergies (hay fever)': 'ENT Specialist',
-        'strep throat': 'ENT Specialist',
-        'cornea infection': 'Ophthalmologist',
-        'conjunctivitis': 'Ophthalmologist',
-        'conjunctivitis due to allergy': 'Ophthalmologist',
-        'blepharitis': 'Ophthalmologist',
-        'stye': 'Ophthalmologist',
-        'macular degeneration': 'Ophthalmologist',
-        'dental caries': 'Dentist',
-        'injury to the leg': 'Orthopedic Surgeon',
-        'injury to the arm': 'Orthopedic Surgeon',
-        'injury to the trunk': 'Orthopedic Surgeon',
-        'sprain or strain': 'Orthopedic Surgeon',
-        'degenerative disc disease': 'Orthopedic Surgeon',
-        'spondylosis': 'Orthopedic Surgeon',
-        'spinal stenosis': 'Orthopedic Surgeon',
-        'herniated disk': 'Orthopedic Surgeon',
-        'arthritis of the hip': 'Orthopedic Surgeon',
-        'bursitis': 'Orthopedic Surgeon',
-        'appendicitis': 'Gastroenterologist',
-        'diverticulitis': 'Gastroenterologist',
-        'noninfectious gastroenteritis': 'Gastroenterologist',
-        'infectious gastroenteritis': 'Gastroenterologist',
-        'gastrointestinal hemorrhage': 'Gastroenterologist',
-        'esophagitis': 'Gastroenterologist',
-        'hiatal hernia': 'Gastroenterologist',
-        'cholecystitis': 'Gastroenterologist',
-        'gallstone': 'Gastroenterologist',
-        'liver disease': 'Hepatologist',
-        'rectal disorder': 'Gastroenterologist',
-        'fungal infection of the hair': 'Dermatologist',
-        'pyogenic skin infection': 'Dermatologist',
-        'drug reaction': 'Dermatologist',
-        'allergy': 'Allergist',
-        'contact dermatitis': 'Dermatologist',
-        'vaginitis': 'Gynecologist',
-        'vaginal cyst': 'Gynecologist',
-        'hyperemesis gravidarum': 'Gynecologist',
-        'problem during pregnancy': 'Gynecologist',
-        'threatened pregnancy': 'Gynecologist',
-        'spontaneous abortion': 'Gynecologist',
-        'idiopathic painful menstruation': 'Gynecologist',
-        'idiopathic irregular menstrual cycle': 'Gynecologist',
-        'idiopathic excessive menstruation': 'Gynecologist',
-        'vulvodynia': 'Gynecologist',
-        'urinary tract infection': 'Urologist',
-        'pyelonephritis': 'Urologist',
-        'cystitis': 'Urologist',
-        'benign prostatic hyperplasia (bph)': 'Urologist',
-        'kidney stone': 'Urologist',
-        'acute kidney injury': 'Nephrologist',
-        'common cold': 'General Physician',
-        'pain after an operation': 'General Physician',
-        'marijuana abuse': 'General Physician',
-        'chronic constipation': 'Gastroenterologist',
-        'psoriasis': 'Dermatologist',
-        'eczema': 'Dermatologist',
-        'sebaceous cyst': 'Dermatologist',
-        'skin pigmentation disorder': 'Dermatologist',
-        'actinic keratosis': 'Dermatologist'
-    }
+    global DISEASE_MODEL, SYMPTOM_CATALOG, MODEL_STAMP, SERVING, MODEL_LOADED_AT
+    start = time.perf_counter()
+    dm = DiseaseModel.load()
+    catalog = SymptomCatalog(dm.symptoms, dm.accuracy, dm.artifact)
+    stamp = model_stamp(dm)
+    METRICS.model_loaded(time.perf_counter() - start)
+    DISEASE_MODEL, SYMPTOM_CATALOG, MODEL_STAMP = dm, catalog, stamp
+    SERVING = (dm, stamp)
+    # entries of the old model can no longer be hit; this only frees them
+    CACHE.clear()
+    MODEL_LOADED_AT = time.time()
+
+
+def model_stamp(dm=None):
+    st = os.stat((dm or DISEASE_MODEL).artifact)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def model_check_due():
+    return time.monotonic() - _last_model_check >= MODEL_CHECK_INTERVAL
+
+
+def check_model_artifact():
+    # reload when the artifact on disk changes. Blocking (stat, hashing, model
+    # load): async handlers call it through the threadpool. Requests arriving
+    # during a reload keep using the current model.
+    global _last_model_check
+    if not _reload_lock.acquire(blocking=False):
+        return
+    try:
+        if not model_check_due():
+            return
+        _last_model_check = time.monotonic()
+        try:
+            changed = model_stamp() != MODEL_STAMP
+        except OSError:
+            return
+        if changed:
+            load_resources()
+    finally:
+        _reload_lock.release()
+
+
+def format_results(dm, probs, req):
+    with METRICS.stage("topk"):
+        idx = top_indices(probs, req.top_k, req.min_probability)
+    if len(idx):
+        METRICS.count_prediction(dm.classes[idx[0]])
+    with METRICS.stage("metadata"):
+        if req.compact:
+            return dm.compact(probs, idx)
+        return {"predictions": dm.describe(probs, idx)}
+
+
+def respond(body):
+    # serialize here (rather than in FastAPI) so the time shows up as a stage
+    with METRICS.stage("serialize"):
+        return JSONResponse(body)
+
+
+def check_options(req):
+    if req.top_k < 1:
+        raise HTTPException(status_code=400, detail="top_k must be at least 1")
+    if not 0.0 <= req.min_probability <= 1.0:
+        raise HTTPException(status_code=400, detail="min_probability must be between 0 and 1")
+
 
-    df["Specialist"] = df["Disease"].str.lower().map(mapping).fillna("General Physician")
-    DISEASE_INFO = df
+def score(col_lists, dm=None):
+    dm = dm or DISEASE_MODEL
+    with METRICS.stage("encode"):
+        X = dm.encode(col_lists)
+    with METRICS.stage("inference"):
+        return dm.backend.predict_proba(X)
+
+
+def score_per_model(items):
+    # micro-batcher items are (model, cols): a batch that straddles a reload is
+    # scored with one predict_proba call per model, each row by its own model
+    groups = {}
+    for i, (dm, cols) in enumerate(items):
+        groups.setdefault(id(dm), (dm, []))[1].append(i)
+    rows = [None] * len(items)
+    for dm, idx in groups.values():
+        for i, row in zip(idx, score([items[i][1] for i in idx], dm)):
+            rows[i] = row
+    return rows
+
+
+def score_cached(dm, stamp, col_lists):
+    # score only the rows missing from the cache, in a single call
+    keys = [CACHE.key(cols, stamp) for cols in col_lists]
+    rows = [CACHE.get(key) for key in keys]
+    missing = [i for i, row in enumerate(rows) if row is None]
+    if missing:
+        probs = score([col_lists[i] for i in missing], dm)
+        for i, row in zip(missing, probs):
+            # a row view would keep the whole batch's array alive in the cache
+            row = row.copy()
+            CACHE.put(keys[i], row)
+            rows[i] = row
+    return rows
+
+
+@app.on_event("startup")
+async def start_batcher():
+    global BATCHER
+    if MICROBATCH_ENABLED:
+        BATCHER = MicroBatcher(score_per_model, window_ms=MICROBATCH_WINDOW_MS, max_batch_size=MICROBATCH_MAX_SIZE)
+        await BATCHER.start()
+
+
+@app.on_event("shutdown")
+async def stop_batcher():
+    if BATCHER:
+        await BATCHER.stop()
 
 
 @app.post("/predict")
-def predict(req: PredictRequest):
-    if not req.symptoms:
-        raise HTTPException(status_code=400, detail="symptoms must be a non-empty list")
+async def predict(req: PredictRequest):
+    with METRICS.stage("validate"):
+        if not req.symptoms:
+            raise HTTPException(status_code=400, detail="symptoms must be a non-empty list")
+        check_options(req)
 
-    # build input vector
-    input_vector = [1 if s in req.symptoms else 0 for s in SYMPTOMS_LIST]
-    X_input = np.array(input_vector).reshape(1, -1)
+    if model_check_due():
+        await run_in_threadpool(check_model_artifact)
+    dm, stamp = SERVING
+    with METRICS.stage("resolve"):
+        cols, unknown = dm.resolve(req.symptoms)
+    METRICS.count_unknown(len(unknown))
+    key = CACHE.key(cols, stamp)
+    probs = CACHE.get(key)
+    if probs is None:
+        if BATCHER:
+            probs = await BATCHER.submit((dm, cols))
+        else:
+            probs = (await run_in_threadpool(score, [cols], dm))[0]
+        probs = probs.copy()
+        CACHE.put(key, probs)
+    return respond({**format_results(dm, probs, req), "unknown_symptoms": unknown, "accuracy": dm.accuracy})
 
-    probs = MODEL.predict_proba(X_input)[0]
-    diseases = LABEL_ENCODER.inverse_transform(np.arange(len(probs)))
 
-    top_idx = np.argsort(probs)[::-1][:3]
-    top_results = []
-    for i in top_idx:
-        disease = diseases[i]
-        prob = float(probs[i])
-        info_row = DISEASE_INFO[DISEASE_INFO["Disease"].str.lower() == disease.lower()]
-        specialist = info_row["Specialist"].values[0] if not info_row.empty else "General Physician"
-        severity = info_row["Severity"].values[0] if not info_row.empty else "Mild"
-        top_results.append({"disease": disease, "probability": prob, "specialist": specialist, "severity": severity})
+@app.post("/predict/batch")
+def predict_batch(req: PredictBatchRequest):
+    with METRICS.stage("validate"):
+        if bool(req.items) == bool(req.columns):
+            raise HTTPException(status_code=400, detail="pass exactly one of items or columns as a non-empty list")
+        rows = req.items or req.columns
+        if len(rows) > MAX_BATCH_SIZE:
+            raise HTTPException(status_code=413, detail=f"at most {MAX_BATCH_SIZE} items per batch")
+        if any(not row for row in rows):
+            raise HTTPException(status_code=400, detail="every item must be a non-empty list of symptoms")
+        check_options(req)
 
-    return {"predictions": top_results, "accuracy": ACCURACY}
+    # score every uncached row with a single predict_proba call
+    if model_check_due():
+        check_model_artifact()
+    dm, stamp = SERVING
+    with METRICS.stage("resolve"):
+        if req.columns:
+            n_features = len(dm.symptoms)
+            if any(not 0 <= c < n_features for cols in req.columns for c in cols):
+                raise HTTPException(status_code=400, detail=f"columns must be between 0 and {n_features - 1}")
+            resolved = [(dm.map_columns(cols), []) for cols in req.columns]
+        else:
+            resolved = [dm.resolve(symptoms) for symptoms in req.items]
+    METRICS.count_unknown(sum(len(unknown) for _, unknown in resolved))
+    probs = score_cached(dm, stamp, [cols for cols, _ in resolved])
+    results = [
+        {**format_results(dm, row, req), "unknown_symptoms": unknown}
+        for row, (_, unknown) in zip(probs, resolved)
+    ]
+    return respond({"results": results, "accuracy": dm.accuracy})
 
 
 @app.get("/symptoms")
-def get_symptoms():
-    # Return the symptoms list and model accuracy
-    if not SYMPTOMS_LIST:
+def get_symptoms(request: Request, q: Optional[str] = None, match: str = "prefix", limit: int = 20):
+    # the full list is serialized and compressed once per model load; ?q= searches it
+    catalog = SYMPTOM_CATALOG
+    if not catalog or not catalog.symptoms:
         raise HTTPException(status_code=500, detail="Symptoms not loaded")
-    return {"symptoms": SYMPTOMS_LIST, "accuracy": ACCURACY}
+    if q is not None:
+        if match not in ("prefix", "substring"):
+            raise HTTPException(status_code=400, detail="match must be 'prefix' or 'substring'")
+        if limit < 1:
+            raise HTTPException(status_code=400, detail="limit must be at least 1")
+        return {"symptoms": catalog.search(q, match, limit), "accuracy": DISEASE_MODEL.accuracy}
+
+    # clients revalidate every time and get a 304 until the model changes
+    headers = {"ETag": catalog.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if catalog.matches_etag(request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+    body, encoding = catalog.encode(request.headers.get("accept-encoding"))
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(body, media_type="application/json", headers=headers)
+
+
+@app.get("/classes")
+def get_classes():
+    # index -> metadata table for clients using compact responses
+    return {"classes": [
+        {"disease": d, "specialist": sp, "severity": sev} for d, sp, sev in DISEASE_MODEL.class_info
+    ]}
+
+
+@app.get("/health")
+def health():
+    # liveness: the process is up and serving
+    return {"status": "ok", "pid": os.getpid()}
+
+
+@app.get("/ready")
+def ready():
+    # readiness: the model is loaded and can score requests
+    if MODEL_LOADED_AT is None:
+        raise HTTPException(status_code=503, detail="model not loaded")
+    return {
+        "status": "ready",
+        "pid": os.getpid(),
+        "model_artifact": DISEASE_MODEL.artifact,
+        "backend": DISEASE_MODEL.backend.name,
+        "loaded_at": MODEL_LOADED_AT,
+    }
+
+
+@app.get("/metrics")
+def prometheus_metrics():
+    cache = CACHE.stats()
+    extra = [
+        ("cache_hits_total", "counter", "Prediction cache hits.", [({}, cache["hits"])]),
+        ("cache_misses_total", "counter", "Prediction cache misses.", [({}, cache["misses"])]),
+        ("cache_evictions_total", "counter", "Prediction cache evictions.", [({}, cache["evictions"])]),
+        ("cache_entries", "gauge", "Entries in the prediction cache.", [({}, cache["size"])]),
+    ]
+    if BATCHER:
+        batcher = BATCHER.stats()
+        extra += [
+            ("batcher_batches_total", "counter", "Micro-batches scored.", [({}, batcher["batches"])]),
+            ("batcher_requests_total", "counter", "Requests scored through the micro-batcher.",
+             [({}, batcher["requests"])]),
+            ("batcher_queue_depth", "gauge", "Requests waiting for the micro-batcher.",
+             [({}, batcher["queue_depth"])]),
+        ]
+    return Response(METRICS.render(extra), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/metrics/cache")
+def cache_metrics():
+    return {**CACHE.stats(), "model_stamp": MODEL_STAMP}
+
+
+@app.get("/metrics/batcher")
+def batcher_metrics():
+    if not BATCHER:
+        return {"enabled": False}
+    return {"enabled": True, **BATCHER.stats()}
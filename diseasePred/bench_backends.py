@@ -0,0 +1,83 @@
+"""Parity check and latency/throughput benchmark across inference backends.
+
+Every available backend is first checked against the CatBoost Python
+wrapper on the same random symptom rows (exit code 1 if any probability
+differs by more than --atol), then timed at batch sizes 1, 32 and 512.
+
+Run from diseasePred/ after new.py has written the .cbm and .onnx files:
+
+    CATBOOST_MODEL_LIB=/path/to/libcatboostmodel.so python bench_backends.py
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+import inference
+from inference import DiseaseModel
+from inference_backends import BACKENDS, make_backend
+
+
+def random_rows(n_rows, n_features, rng, max_symptoms=6):
+    X = np.zeros((n_rows, n_features), dtype=np.uint8)
+    for row in X:
+        row[rng.choice(n_features, size=rng.integers(1, max_symptoms + 1), replace=False)] = 1
+    return X
+
+
+def load_backends(model):
+    backends = {}
+    for name in BACKENDS:
+        try:
+            backends[name] = make_backend(
+                name,
+                model=model,
+                cbm_path=inference.MODEL_CBM_PATH,
+                onnx_path=inference.MODEL_ONNX_PATH,
+                lib_path=inference.CATBOOST_MODEL_LIB,
+            )
+        except Exception as e:
+            print(f"skipping {name}: {e}")
+    return backends
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--atol", type=float, default=1e-5)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    # the catboost backend is the parity reference, so load the Python model
+    dm = DiseaseModel.load(backend="catboost")
+    rng = np.random.default_rng(42)
+    n_features = dm.n_features
+    backends = load_backends(dm.model)
+
+    # parity against the Python wrapper
+    X = random_rows(256, n_features, rng)
+    reference = backends["catboost"].predict_proba(X)
+    failed = False
+    for name, backend in backends.items():
+        diff = float(np.abs(backend.predict_proba(X) - reference).max())
+        ok = diff <= args.atol
+        failed |= not ok
+        print(f"parity {name:>9}: max |diff| = {diff:.2e} {'ok' if ok else 'FAIL'}")
+
+    print(f"\n{'backend':>9} {'batch':>6} {'ms/batch':>10} {'rows/sec':>12}")
+    for batch_size in (1, 32, 512):
+        X = random_rows(batch_size, n_features, rng)
+        for name, backend in backends.items():
+            backend.predict_proba(X)  # warm up
+            start = time.perf_counter()
+            for _ in range(args.repeats):
+                backend.predict_proba(X)
+            elapsed = (time.perf_counter() - start) / args.repeats
+            print(f"{name:>9} {batch_size:>6} {elapsed * 1000:>10.3f} {batch_size / elapsed:>12.1f}")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
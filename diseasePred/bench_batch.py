@@ -0,0 +1,40 @@
+"""Rows/sec for the batched prediction path at batch sizes 1..1024.
+
+Run from diseasePred/ (needs the trained model artifact):
+
+    python bench_batch.py
+"""
+import time
+
+import numpy as np
+
+import api_server
+
+
+def main(repeats=5, max_symptoms=6, seed=42):
+    api_server.load_resources()
+    rng = np.random.default_rng(seed)
+    symptoms = api_server.DISEASE_MODEL.symptoms
+
+    print(f"{'batch':>6} {'rows/sec':>12} {'ms/batch':>10}")
+    for batch_size in [2 ** i for i in range(11)]:
+        items = [
+            list(rng.choice(symptoms, size=rng.integers(1, max_symptoms + 1), replace=False))
+            for _ in range(batch_size)
+        ]
+        req = api_server.PredictBatchRequest(items=items)
+        api_server.predict_batch(req)  # warm up
+
+        # clear the prediction cache so every repeat pays for inference
+        elapsed = 0.0
+        for _ in range(repeats):
+            api_server.CACHE.clear()
+            start = time.perf_counter()
+            api_server.predict_batch(req)
+            elapsed += time.perf_counter() - start
+        elapsed /= repeats
+        print(f"{batch_size:>6} {batch_size / elapsed:>12.1f} {elapsed * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
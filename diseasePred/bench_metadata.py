@@ -0,0 +1,66 @@
+"""Per-request overhead of turning class probabilities into top-3 results.
+
+Compares the old path (inverse_transform + a pandas scan per result) with
+the precomputed DiseaseModel.class_info lookup. Exits non-zero if the
+lookup path goes over the budget, so it can guard regressions in CI.
+
+Run from diseasePred/ (needs the trained model artifact):
+
+    python bench_metadata.py --max-us 50
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import LabelEncoder
+
+from inference import DiseaseModel
+
+
+def old_top_results(probs, label_encoder, info):
+    diseases = label_encoder.inverse_transform(np.arange(len(probs)))
+    results = []
+    for i in np.argsort(probs)[::-1][:3]:
+        disease = diseases[i]
+        info_row = info[info["Disease"].str.lower() == disease.lower()]
+        specialist = info_row["Specialist"].values[0] if not info_row.empty else "General Physician"
+        severity = info_row["Severity"].values[0] if not info_row.empty else "Mild"
+        results.append({"disease": disease, "probability": float(probs[i]), "specialist": specialist, "severity": severity})
+    return results
+
+
+def per_call_us(fn, rows):
+    start = time.perf_counter()
+    for probs in rows:
+        fn(probs)
+    return (time.perf_counter() - start) / len(rows) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--max-us", type=float, default=None, help="fail if the new path exceeds this")
+    args = parser.parse_args()
+
+    dm = DiseaseModel.load()
+    n_classes = len(dm.class_info)
+
+    # rebuild the DataFrame and LabelEncoder the old path scanned
+    info = pd.DataFrame(dm.class_info, columns=["Disease", "Specialist", "Severity"])
+    label_encoder = LabelEncoder().fit(info["Disease"])
+    rows = np.random.default_rng(42).dirichlet(np.ones(n_classes), size=args.requests)
+
+    old_us = per_call_us(lambda probs: old_top_results(probs, label_encoder, info), rows)
+    new_us = per_call_us(dm.top_results, rows)
+    print(f"pandas scan:  {old_us:10.1f} us/request")
+    print(f"class index:  {new_us:10.1f} us/request  ({old_us / new_us:.1f}x faster)")
+
+    if args.max_us is not None and new_us > args.max_us:
+        print(f"FAIL: {new_us:.1f} us/request exceeds budget of {args.max_us} us")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Compare load time and peak memory of the dense and CSR parse paths.
+
+Each mode runs ``new.parse_csv`` in a fresh subprocess, so peak RSS
+(``ru_maxrss``) is measured for that mode alone:
+
+    python bench_parse.py --csv "Disease and symptoms dataset.csv"
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+
+def run_one(csv_path, sparse):
+    from new import parse_csv
+
+    start = time.perf_counter()
+    X = parse_csv(csv_path, sparse=sparse)["X"]
+    elapsed = time.perf_counter() - start
+    nbytes = X.data.nbytes + X.indices.nbytes + X.indptr.nbytes if sparse else X.nbytes
+    # ru_maxrss is in KiB on Linux
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({"seconds": elapsed, "matrix_mb": nbytes / 1e6, "peak_rss_mb": peak_mb}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--csv", default="Disease and symptoms dataset.csv")
+    parser.add_argument("--child", choices=["dense", "sparse"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_one(args.csv, args.child == "sparse")
+        return
+
+    print(f"{'mode':>7} {'seconds':>9} {'matrix MB':>10} {'peak RSS MB':>12}")
+    for mode in ("dense", "sparse"):
+        out = subprocess.run(
+            [sys.executable, __file__, "--csv", args.csv, "--child", mode],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        r = json.loads(out.strip().splitlines()[-1])
+        print(f"{mode:>7} {r['seconds']:>9.2f} {r['matrix_mb']:>10.1f} {r['peak_rss_mb']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Cold-start time of the prediction server: pickle vs native .cbm + sidecar.
+
+Each format is loaded in a fresh interpreter so import costs are counted.
+The native format is also timed with the ONNX backend, which skips the
+catboost package (and with it pandas) entirely. Run from diseasePred/
+after new.py has written the artifacts:
+
+    python bench_startup.py --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+import api_server
+api_server.load_resources()
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    "seconds": elapsed,
+    "pandas": "pandas" in sys.modules,
+    "sklearn": "sklearn" in sys.modules,
+}))
+"""
+
+
+def run_once(model_format, backend):
+    env = dict(os.environ, MODEL_FORMAT=model_format, INFERENCE_BACKEND=backend)
+    out = subprocess.run([sys.executable, "-c", CHILD], env=env, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    for model_format, backend in (("pickle", "catboost"), ("native", "catboost"), ("native", "onnx")):
+        try:
+            results = [run_once(model_format, backend) for _ in range(args.runs)]
+        except subprocess.CalledProcessError as e:
+            print(f"{model_format:>7} {backend:>8}: failed\n{e.stderr.strip()[-500:]}")
+            continue
+        times = [r["seconds"] for r in results]
+        print(
+            f"{model_format:>7} {backend:>8}: median {statistics.median(times) * 1000:8.1f} ms  "
+            f"min {min(times) * 1000:8.1f} ms  "
+            f"pandas={results[0]['pandas']} sklearn={results[0]['sklearn']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
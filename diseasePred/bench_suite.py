@@ -0,0 +1,207 @@
+"""Benchmark suite for the disease prediction service.
+
+Microbenchmarks (in process, on the loaded model) time symptom
+resolution, dense/CSR encoding, backend predict_proba, top-k selection
+and the metadata lookup at a few batch sizes. With --http the suite
+also starts gunicorn (gunicorn.conf.py, serve:app) and load-tests
+/predict at fixed concurrency levels. Inputs come from
+synthetic_symptoms.py.
+
+Every result reports p50/p95/p99 latency and throughput. The run
+metadata (commit, host, RSS) and all results can be written with --json
+so runs can be compared over time. Run from diseasePred/:
+
+    python bench_suite.py --json results/$(date +%F).json
+    python bench_suite.py --http --concurrency 1 8 32 --requests 2000
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import resource
+import signal
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from bench_workers import children, memory_kb, wait_ready
+from inference import DiseaseModel, encode_symptoms, encode_symptoms_csr, top_indices
+from synthetic_symptoms import SymptomSetGenerator
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def summarize(name, times, rows_per_call=1, **extra):
+    # times in seconds, one per call
+    return {
+        "name": name,
+        **extra,
+        "calls": len(times),
+        "p50_us": percentile(times, 0.50) * 1e6,
+        "p95_us": percentile(times, 0.95) * 1e6,
+        "p99_us": percentile(times, 0.99) * 1e6,
+        "rows_per_sec": rows_per_call * len(times) / sum(times),
+    }
+
+
+def time_calls(fn, args_list, warmup=3):
+    for args in args_list[:warmup]:
+        fn(*args)
+    times = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def run_micro(dm, gen, batch_sizes, calls):
+    n_features = dm.n_features
+    results = []
+
+    cases = gen.batch(calls)
+    results.append(summarize("resolve", time_calls(dm.resolve, [(c,) for c in cases])))
+
+    for batch_size in batch_sizes:
+        col_lists = [[dm.resolve(s)[0] for s in gen.batch(batch_size)] for _ in range(calls)]
+        results.append(summarize("encode_dense", time_calls(encode_symptoms, [(c, n_features) for c in col_lists]),
+                                 batch_size, batch=batch_size))
+        try:
+            times = time_calls(encode_symptoms_csr, [(c, n_features) for c in col_lists])
+            results.append(summarize("encode_csr", times, batch_size, batch=batch_size))
+        except ImportError:
+            pass
+
+        # the model dominates here, so fewer calls
+        inputs = [(dm.encode(c),) for c in col_lists[:max(10, calls // 20)]]
+        results.append(summarize("predict_proba", time_calls(dm.backend.predict_proba, inputs), batch_size,
+                                 batch=batch_size, backend=dm.backend.name))
+
+    probs = np.random.default_rng(42).dirichlet(np.ones(len(dm.classes)), size=calls)
+    results.append(summarize("top_k", time_calls(top_indices, [(p, 3) for p in probs])))
+    results.append(summarize("top_results", time_calls(dm.top_results, [(p, 3) for p in probs])))
+    results.append(summarize("compact_results", time_calls(dm.compact_results, [(p, 3) for p in probs])))
+    return results
+
+
+def post(url, body):
+    req = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=30) as r:
+            r.read()
+            status = r.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    return status, time.perf_counter() - start
+
+
+def run_http(args, symptoms):
+    env = dict(os.environ, PORT=str(args.port), WEB_CONCURRENCY=str(args.workers))
+    if not args.cache:
+        env["PREDICTION_CACHE_SIZE"] = "0"
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "serve:app"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base = f"http://127.0.0.1:{args.port}"
+    results = []
+    try:
+        wait_ready(base)
+        gen = SymptomSetGenerator(symptoms, seed=args.seed)
+        for concurrency in args.concurrency:
+            bodies = [json.dumps({"symptoms": s}).encode() for s in gen.batch(args.requests)]
+            start = time.perf_counter()
+            with ThreadPoolExecutor(concurrency) as pool:
+                responses = list(pool.map(lambda b: post(f"{base}/predict", b), bodies))
+            elapsed = time.perf_counter() - start
+            ok = [t for status, t in responses if status == 200]
+            rss = [memory_kb(pid)[0] for pid in [proc.pid] + children(proc.pid)]
+            results.append({
+                "name": "http_predict",
+                "concurrency": concurrency,
+                "requests": len(bodies),
+                "errors": len(bodies) - len(ok),
+                "p50_ms": percentile(ok, 0.50) * 1000 if ok else None,
+                "p95_ms": percentile(ok, 0.95) * 1000 if ok else None,
+                "p99_ms": percentile(ok, 0.99) * 1000 if ok else None,
+                "requests_per_sec": len(ok) / elapsed,
+                "server_rss_mb": sum(rss) / 1024,
+            })
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        proc.wait(timeout=30)
+    return results
+
+
+def run_info():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "suite": "diseasePred",
+        "started_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": commit or None,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def print_results(results):
+    for r in results:
+        if r["name"].startswith("http_"):
+            fmt = lambda v: f"{v:8.1f}ms" if v is not None else "       n/a"
+            print(f"{r['name']:<16} conc={r['concurrency']:<4} {fmt(r['p50_ms'])} {fmt(r['p95_ms'])} "
+                  f"{fmt(r['p99_ms'])} {r['requests_per_sec']:>9.1f} req/s  rss {r['server_rss_mb']:.0f}MB"
+                  f"  errors {r['errors']}")
+        else:
+            label = f"batch={r['batch']}" if "batch" in r else ""
+            print(f"{r['name']:<16} {label:<9} {r['p50_us']:>10.1f}us {r['p95_us']:>10.1f}us "
+                  f"{r['p99_us']:>10.1f}us {r['rows_per_sec']:>12.1f} rows/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 32, 512])
+    parser.add_argument("--calls", type=int, default=1000, help="timed calls per microbenchmark")
+    parser.add_argument("--http", action="store_true", help="also load-test /predict over HTTP")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=2000, help="requests per concurrency level")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--port", type=int, default=5099)
+    parser.add_argument("--cache", action="store_true", help="keep the prediction cache on for the HTTP run")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", metavar="PATH", help="write run info and results as JSON")
+    args = parser.parse_args()
+
+    info = run_info()
+    dm = DiseaseModel.load()
+    gen = SymptomSetGenerator(dm.symptoms, seed=args.seed)
+    results = run_micro(dm, gen, args.batch_sizes, args.calls)
+    # ru_maxrss is in KiB on Linux
+    info["bench_peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    if args.http:
+        results += run_http(args, dm.symptoms)
+
+    print(f"{'benchmark':<16} {'':<9} {'p50':>12} {'p95':>12} {'p99':>12} {'throughput':>17}")
+    print_results(results)
+    if args.json:
+        os.makedirs(os.path.dirname(args.json) or ".", exist_ok=True)
+        with open(args.json, "w") as f:
+            json.dump({**info, "results": results}, f, indent=2)
+        print(f"\n📄 Results saved to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""RSS/PSS per worker and throughput scaling for the pre-fork server.
+
+Starts gunicorn (gunicorn.conf.py, serve:app) for each worker count,
+waits for /ready, fires concurrent /predict requests and reads memory
+from /proc. PSS splits shared pages between the processes using them,
+so it shows how much of the model is actually shared. Linux only.
+
+Run from diseasePred/:
+
+    python bench_workers.py --workers 1 2 4 --requests 2000
+"""
+import argparse
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def memory_kb(pid):
+    # (rss, pss) from smaps_rollup
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ("Rss:", "Pss:"):
+                values[parts[0]] = int(parts[1])
+    return values.get("Rss:", 0), values.get("Pss:", 0)
+
+
+def children(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(p) for p in f.read().split()]
+
+
+def wait_ready(base, timeout=120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"{base}/ready", timeout=1) as r:
+                if r.status == 200:
+                    return
+        except OSError:
+            pass
+        time.sleep(0.25)
+    raise RuntimeError("server did not become ready")
+
+
+def post(url, body):
+    req = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req, timeout=30) as r:
+        r.read()
+
+
+def run(n_workers, port, n_requests, concurrency):
+    env = dict(os.environ, WEB_CONCURRENCY=str(n_workers), PORT=str(port), PREDICTION_CACHE_SIZE="0")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "serve:app"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base = f"http://127.0.0.1:{port}"
+    try:
+        wait_ready(base)
+        with urllib.request.urlopen(f"{base}/symptoms") as r:
+            symptoms = json.load(r)["symptoms"]
+        rng = random.Random(42)
+        bodies = [
+            json.dumps({"symptoms": rng.sample(symptoms, rng.randint(1, 6))}).encode()
+            for _ in range(n_requests)
+        ]
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as pool:
+            list(pool.map(lambda b: post(f"{base}/predict", b), bodies))
+        elapsed = time.perf_counter() - start
+
+        workers = children(proc.pid)
+        mem = [memory_kb(pid) for pid in workers]
+        master_rss, master_pss = memory_kb(proc.pid)
+        return {
+            "workers": n_workers,
+            "requests_per_sec": n_requests / elapsed,
+            "master_rss_mb": master_rss / 1024,
+            "worker_rss_mb": sum(r for r, _ in mem) / len(mem) / 1024,
+            "worker_pss_mb": sum(p for _, p in mem) / len(mem) / 1024,
+            "total_pss_mb": (master_pss + sum(p for _, p in mem)) / 1024,
+        }
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        proc.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--port", type=int, default=5099)
+    args = parser.parse_args()
+
+    print(f"{'workers':>7} {'req/s':>9} {'rss/worker':>11} {'pss/worker':>11} {'total pss':>10}")
+    for n in args.workers:
+        r = run(n, args.port, args.requests, args.concurrency)
+        print(
+            f"{r['workers']:>7} {r['requests_per_sec']:>9.1f} {r['worker_rss_mb']:>9.1f}MB "
+            f"{r['worker_pss_mb']:>9.1f}MB {r['total_pss_mb']:>8.1f}MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Specialist and severity metadata for predicted diseases.
+
+Pure Python so it can be imported by the serving process without pandas.
+"""
+
+SEVERE = {"heart attack", "stroke", "cancer", "kidney failure", "liver cirrhosis", "covid-19", "pneumonia"}
+MODERATE = {"diabetes", "hypertension", "asthma", "arthritis", "tuberculosis", "depression"}
+
+SPECIALISTS = {
+    'multiple sclerosis': 'Neurologist',
+    'neurosis': 'Psychiatrist',
+    'psychotic disorder': 'Psychiatrist',
+    'personality disorder': 'Psychiatrist',
+    'panic disorder': 'Psychiatrist',
+    'acute stress reaction': 'Psychiatrist',
+    'anxiety': 'Psychiatrist',
+    'complex regional pain syndrome': 'Neurologist',
+    'peripheral nerve disorder': 'Neurologist',
+    'concussion': 'Neurologist',
+    'developmental disability': 'Neurologist',
+    'heart attack': 'Cardiologist',
+    'heart failure': 'Cardiologist',
+    'hypertensive heart disease': 'Cardiologist',
+    'angina': 'Cardiologist',
+    'sinus bradycardia': 'Cardiologist',
+    'asthma': 'Pulmonologist',
+    'chronic obstructive pulmonary disease (copd)': 'Pulmonologist',
+    'acute bronchitis': 'Pulmonologist',
+    'acute bronchiolitis': 'Pulmonologist',
+    'pneumonia': 'Pulmonologist',
+    'acute bronchospasm': 'Pulmonologist',
+    'obstructive sleep apnea (osa)': 'Pulmonologist',
+    'croup': 'Pulmonologist',
+    'sickle cell crisis': 'Hematologist',
+    'sepsis': 'Infectious Disease Specialist',
+    'hypoglycemia': 'Endocrinologist',
+    'otitis media': 'ENT Specialist',
+    "otitis externa (swimmer's ear)": 'ENT Specialist',
+    'ear drum damage': 'ENT Specialist',
+    'eustachian tube dysfunction (ear disorder)': 'ENT Specialist',
+    'nose disorder': 'ENT Specialist',
+    'acute sinusitis': 'ENT Specialist',
+    'seasonal allergies (hay fever)': 'ENT Specialist',
+    'strep throat': 'ENT Specialist',
+    'cornea infection': 'Ophthalmologist',
+    'conjunctivitis': 'Ophthalmologist',
+    'conjunctivitis due to allergy': 'Ophthalmologist',
+    'blepharitis': 'Ophthalmologist',
+    'stye': 'Ophthalmologist',
+    'macular degeneration': 'Ophthalmologist',
+    'dental caries': 'Dentist',
+    'injury to the leg': 'Orthopedic Surgeon',
+    'injury to the arm': 'Orthopedic Surgeon',
+    'injury to the trunk': 'Orthopedic Surgeon',
+    'sprain or strain': 'Orthopedic Surgeon',
+    'degenerative disc disease': 'Orthopedic Surgeon',
+    'spondylosis': 'Orthopedic Surgeon',
+    'spinal stenosis': 'Orthopedic Surgeon',
+    'herniated disk': 'Orthopedic Surgeon',
+    'arthritis of the hip': 'Orthopedic Surgeon',
+    'bursitis': 'Orthopedic Surgeon',
+    'appendicitis': 'Gastroenterologist',
+    'diverticulitis': 'Gastroenterologist',
+    'noninfectious gastroenteritis': 'Gastroenterologist',
+    'infectious gastroenteritis': 'Gastroenterologist',
+    'gastrointestinal hemorrhage': 'Gastroenterologist',
+    'esophagitis': 'Gastroenterologist',
+    'hiatal hernia': 'Gastroenterologist',
+    'cholecystitis': 'Gastroenterologist',
+    'gallstone': 'Gastroenterologist',
+    'liver disease': 'Hepatologist',
+    'rectal disorder': 'Gastroenterologist',
+    'fungal infection of the hair': 'Dermatologist',
+    'pyogenic skin infection': 'Dermatologist',
+    'drug reaction': 'Dermatologist',
+    'allergy': 'Allergist',
+    'contact dermatitis': 'Dermatologist',
+    'vaginitis': 'Gynecologist',
+    'vaginal cyst': 'Gynecologist',
+    'hyperemesis gravidarum': 'Gynecologist',
+    'problem during pregnancy': 'Gynecologist',
+    'threatened pregnancy': 'Gynecologist',
+    'spontaneous abortion': 'Gynecologist',
+    'idiopathic painful menstruation': 'Gynecologist',
+    'idiopathic irregular menstrual cycle': 'Gynecologist',
+    'idiopathic excessive menstruation': 'Gynecologist',
+    'vulvodynia': 'Gynecologist',
+    'urinary tract infection': 'Urologist',
+    'pyelonephritis': 'Urologist',
+    'cystitis': 'Urologist',
+    'benign prostatic hyperplasia (bph)': 'Urologist',
+    'kidney stone': 'Urologist',
+    'acute kidney injury': 'Nephrologist',
+    'common cold': 'General Physician',
+    'pain after an operation': 'General Physician',
+    'marijuana abuse': 'General Physician',
+    'chronic constipation': 'Gastroenterologist',
+    'psoriasis': 'Dermatologist',
+    'eczema': 'Dermatologist',
+    'sebaceous cyst': 'Dermatologist',
+    'skin pigmentation disorder': 'Dermatologist',
+    'actinic keratosis': 'Dermatologist'
+}
+
+
+def severity_for(disease):
+    name = disease.lower()
+    if name in SEVERE:
+        return "Severe"
+    if name in MODERATE:
+        return "Moderate"
+    return "Mild"
+
+
+def specialist_for(disease):
+    return SPECIALISTS.get(disease.lower(), "General Physician")
+
+
+def class_info(diseases):
+    # (disease, specialist, severity) per class index
+    return [(d, specialist_for(d), severity_for(d)) for d in diseases]
@@ -0,0 +1,13 @@
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5001')}"
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# load the model in the master before fork (copy-on-write sharing)
+preload_app = True
+
+timeout = 30
+graceful_timeout = 30
+keepalive = 5
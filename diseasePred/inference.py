@@ -0,0 +1,220 @@
+"""Disease prediction core shared by the FastAPI server and the Streamlit app.
+
+``DiseaseModel.load()`` reads the trained artifacts once: the native
+``.cbm`` + JSON sidecar when present, otherwise the legacy pickle. It
+then builds everything the hot path needs: the inference backend, the
+symptom -> column index and the (disease, specialist, severity) table
+aligned with the class indices.
+"""
+import difflib
+import json
+import os
+import pickle
+import re
+from functools import lru_cache
+
+import numpy as np
+
+from disease_meta import class_info
+from inference_backends import make_backend
+
+MODEL_PATH = os.getenv("MODEL_PATH", "disease_prediction_catboost_hybrid.pkl")
+MODEL_CBM_PATH = os.getenv("MODEL_CBM_PATH", "disease_prediction_catboost.cbm")
+MODEL_META_PATH = os.getenv("MODEL_META_PATH", "disease_prediction_meta.json")
+# auto: prefer the native .cbm + sidecar when both exist, else the pickle
+MODEL_FORMAT = os.getenv("MODEL_FORMAT", "auto")
+# catboost (Python wrapper), capi (libcatboostmodel via ctypes) or onnx (ONNX Runtime)
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "catboost")
+MODEL_ONNX_PATH = os.getenv("MODEL_ONNX_PATH", "disease_prediction_catboost.onnx")
+CATBOOST_MODEL_LIB = os.getenv("CATBOOST_MODEL_LIB")
+
+# serve a compacted variant written by new.py --compact-* (see model_variants/report.csv)
+MODEL_VARIANT = os.getenv("MODEL_VARIANT", "")
+MODEL_VARIANTS_DIR = os.getenv("MODEL_VARIANTS_DIR", "model_variants")
+if MODEL_VARIANT:
+    MODEL_CBM_PATH = os.path.join(MODEL_VARIANTS_DIR, MODEL_VARIANT, "model.cbm")
+    MODEL_META_PATH = os.path.join(MODEL_VARIANTS_DIR, MODEL_VARIANT, "meta.json")
+    MODEL_ONNX_PATH = os.path.join(MODEL_VARIANTS_DIR, MODEL_VARIANT, "model.onnx")
+    MODEL_FORMAT = "native"
+
+# optional JSON file mapping alias -> canonical symptom name
+SYMPTOM_ALIASES_PATH = os.getenv("SYMPTOM_ALIASES_PATH", "symptom_aliases.json")
+FUZZY_CUTOFF = float(os.getenv("SYMPTOM_FUZZY_CUTOFF", "0.9"))
+# fuzzy matching scans the whole vocabulary: past this many misses in one
+# list, further unknown names are reported without trying it
+FUZZY_MAX_MISSES = int(os.getenv("SYMPTOM_FUZZY_MAX_MISSES", "5"))
+# batches at least this large are scored as CSR when the backend accepts it (0 = never)
+SPARSE_BATCH_MIN_ROWS = int(os.getenv("SPARSE_BATCH_MIN_ROWS", "64"))
+
+
+def normalize_symptom(name):
+    return re.sub(r"[\s_\-]+", " ", name.strip().lower())
+
+
+def build_symptom_index(symptoms, aliases_path=SYMPTOM_ALIASES_PATH):
+    # normalized symptom name (or alias) -> column index
+    index = {normalize_symptom(s): i for i, s in enumerate(symptoms)}
+    if aliases_path and os.path.exists(aliases_path):
+        with open(aliases_path) as f:
+            aliases = json.load(f)
+        for alias, canonical in aliases.items():
+            col = index.get(normalize_symptom(canonical))
+            if col is not None:
+                index.setdefault(normalize_symptom(alias), col)
+    return index
+
+
+def encode_symptoms(col_lists, n_features):
+    # build an N x F input matrix by scattering ones into a zeroed buffer
+    X = np.zeros((len(col_lists), n_features), dtype=np.uint8)
+    for row, cols in enumerate(col_lists):
+        X[row, cols] = 1
+    return X
+
+
+def encode_symptoms_csr(col_lists, n_features):
+    # the same matrix as CSR, built straight from the column lists
+    from scipy import sparse as sp
+
+    cols = [sorted(set(c)) for c in col_lists]
+    indptr = np.zeros(len(cols) + 1, dtype=np.int32)
+    np.cumsum([len(c) for c in cols], out=indptr[1:])
+    indices = np.fromiter((i for c in cols for i in c), dtype=np.int32, count=int(indptr[-1]))
+    data = np.ones(len(indices), dtype=np.uint8)
+    return sp.csr_matrix((data, indices, indptr), shape=(len(cols), n_features))
+
+
+def top_indices(probs, k=3, min_probability=0.0):
+    # threshold first, then argpartition so only the selected classes get sorted
+    idx = np.flatnonzero(probs >= min_probability) if min_probability > 0 else np.arange(len(probs))
+    if k < len(idx):
+        idx = idx[np.argpartition(probs[idx], -k)[-k:]]
+    return idx[np.argsort(probs[idx])[::-1]]
+
+
+class DiseaseModel:
+    def __init__(self, model, symptoms, classes, accuracy, artifact, backend, model_columns=None):
+        self.model = model
+        self.symptoms = list(symptoms)
+        self.classes = list(classes)
+        self.accuracy = accuracy
+        self.artifact = artifact
+        self.backend = backend
+        self.symptom_index = build_symptom_index(self.symptoms)
+        # a feature-pruned variant only uses some of the symptoms: map symptom
+        # index -> model column, with -1 for symptoms it dropped
+        self.column_map = None
+        self.n_features = len(self.symptoms)
+        if model_columns is not None:
+            self.column_map = np.full(len(self.symptoms), -1, dtype=np.int64)
+            self.column_map[list(model_columns)] = np.arange(len(model_columns))
+            self.symptom_index = {k: int(self.column_map[v]) for k, v in self.symptom_index.items()}
+            self.n_features = len(model_columns)
+        self.class_info = class_info(self.classes)
+        # only reached on an index miss; results are cached per key
+        self._fuzzy_column = lru_cache(maxsize=4096)(self._fuzzy_lookup)
+
+    @classmethod
+    def load(cls, model_format=MODEL_FORMAT, backend=INFERENCE_BACKEND):
+        use_native = model_format == "native" or (
+            model_format == "auto" and os.path.exists(MODEL_CBM_PATH) and os.path.exists(MODEL_META_PATH)
+        )
+        if use_native:
+            model, symptoms, classes, accuracy, artifact, model_columns = cls._load_native(backend)
+        else:
+            model, symptoms, classes, accuracy, artifact, model_columns = cls._load_pickle()
+        inference_backend = make_backend(
+            backend,
+            model=model,
+            cbm_path=MODEL_CBM_PATH,
+            onnx_path=MODEL_ONNX_PATH,
+            lib_path=CATBOOST_MODEL_LIB,
+        )
+        return cls(model, symptoms, classes, accuracy, artifact, inference_backend, model_columns)
+
+    @staticmethod
+    def _load_native(backend=INFERENCE_BACKEND):
+        # native CatBoost model + JSON sidecar: no sklearn in the process. The
+        # catboost package itself imports pandas, so the Python model is only
+        # built for the catboost backend; capi and onnx read their own files.
+        with open(MODEL_META_PATH) as f:
+            meta = json.load(f)
+        model = None
+        if backend == "catboost":
+            from catboost import CatBoostClassifier
+
+            model = CatBoostClassifier()
+            model.load_model(MODEL_CBM_PATH, format="cbm")
+        return (model, meta["symptoms"], meta["classes"], meta.get("accuracy", None), MODEL_CBM_PATH,
+                meta.get("model_columns"))
+
+    @staticmethod
+    def _load_pickle():
+        # legacy artifact: unpickling pulls in sklearn for the LabelEncoder
+        with open(MODEL_PATH, "rb") as f:
+            data = pickle.load(f)
+        classes = list(data["label_encoder"].classes_)
+        return data["model"], data["symptoms"], classes, data.get("accuracy", None), MODEL_PATH, None
+
+    def _fuzzy_lookup(self, key):
+        match = difflib.get_close_matches(key, list(self.symptom_index), n=1, cutoff=FUZZY_CUTOFF)
+        return self.symptom_index[match[0]] if match else None
+
+    def resolve(self, symptoms):
+        # map names to model columns; unknown names are returned rather than dropped,
+        # symptoms a pruned variant does not use are skipped
+        cols, unknown = [], []
+        misses = 0
+        for s in symptoms:
+            key = normalize_symptom(s)
+            col = self.symptom_index.get(key)
+            if col is None and misses < FUZZY_MAX_MISSES:
+                misses += 1
+                col = self._fuzzy_column(key)
+            if col is None:
+                unknown.append(s)
+            elif col >= 0:
+                cols.append(col)
+        return cols, unknown
+
+    def map_columns(self, cols):
+        # indices into self.symptoms (the /symptoms order) -> model columns
+        if self.column_map is None:
+            return list(cols)
+        return [int(c) for c in self.column_map[cols] if c >= 0]
+
+    def encode(self, col_lists):
+        if (SPARSE_BATCH_MIN_ROWS and len(col_lists) >= SPARSE_BATCH_MIN_ROWS
+                and getattr(self.backend, "accepts_sparse", False)):
+            return encode_symptoms_csr(col_lists, self.n_features)
+        return encode_symptoms(col_lists, self.n_features)
+
+    def score(self, col_lists):
+        return self.backend.predict_proba(self.encode(col_lists))
+
+    def top_results(self, probs, k=3, min_probability=0.0):
+        return self.describe(probs, top_indices(probs, k, min_probability))
+
+    def describe(self, probs, idx):
+        # metadata for already selected class indices
+        results = []
+        for i in idx:
+            disease, specialist, severity = self.class_info[i]
+            results.append({"disease": disease, "probability": float(probs[i]), "specialist": specialist, "severity": severity})
+        return results
+
+    def compact_results(self, probs, k=3, min_probability=0.0):
+        return self.compact(probs, top_indices(probs, k, min_probability))
+
+    @staticmethod
+    def compact(probs, idx):
+        # class indices (see /classes) and probabilities at 7 significant digits (about
+        # float32 precision), so float32 values don't serialize their float64 expansion
+        # and tiny probabilities aren't flushed to 0
+        return {"classes": idx.tolist(), "probabilities": [float(f"{p:.7g}") for p in probs[idx].tolist()]}
+
+    def predict(self, symptoms, k=3, min_probability=0.0):
+        """Score one symptom list. Returns (top results, unknown symptoms)."""
+        cols, unknown = self.resolve(symptoms)
+        probs = self.score([cols])[0]
+        return self.top_results(probs, k, min_probability), unknown
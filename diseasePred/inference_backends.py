@@ -0,0 +1,134 @@
+"""Pluggable inference backends for the disease classifier.
+
+Every backend exposes ``predict_proba(X)`` taking an N x F matrix of 0/1
+symptom flags and returning an N x C float array of class probabilities,
+in the same class order as the training LabelEncoder. Backends with
+``accepts_sparse = True`` also take a scipy CSR matrix of the same shape.
+
+- ``catboost``: the Python ``CatBoostClassifier.predict_proba`` wrapper.
+- ``capi``: the standalone CatBoost evaluator library (``libcatboostmodel``)
+  called through ctypes on the native ``.cbm`` file.
+- ``onnx``: an ONNX export of the model run with ONNX Runtime on CPU.
+"""
+import ctypes
+import os
+
+import numpy as np
+
+
+class CatBoostBackend:
+    name = "catboost"
+    accepts_sparse = True
+
+    def __init__(self, model):
+        self.model = model
+
+    def predict_proba(self, X):
+        return self.model.predict_proba(X)
+
+
+class CatBoostCApiBackend:
+    name = "capi"
+    accepts_sparse = False
+
+    def __init__(self, cbm_path, lib_path):
+        lib = ctypes.CDLL(lib_path)
+        lib.ModelCalcerCreate.restype = ctypes.c_void_p
+        lib.ModelCalcerDelete.argtypes = [ctypes.c_void_p]
+        lib.GetErrorString.restype = ctypes.c_char_p
+        lib.LoadFullModelFromFile.argtypes = [ctypes.c_void_p, ctypes.c_char_p]
+        lib.LoadFullModelFromFile.restype = ctypes.c_bool
+        lib.SetPredictionTypeString.argtypes = [ctypes.c_void_p, ctypes.c_char_p]
+        lib.SetPredictionTypeString.restype = ctypes.c_bool
+        lib.GetDimensionsCount.argtypes = [ctypes.c_void_p]
+        lib.GetDimensionsCount.restype = ctypes.c_size_t
+        lib.CalcModelPredictionFlat.argtypes = [
+            ctypes.c_void_p,
+            ctypes.c_size_t,
+            ctypes.POINTER(ctypes.POINTER(ctypes.c_float)),
+            ctypes.c_size_t,
+            ctypes.POINTER(ctypes.c_double),
+            ctypes.c_size_t,
+        ]
+        lib.CalcModelPredictionFlat.restype = ctypes.c_bool
+        self.lib = lib
+
+        self.handle = lib.ModelCalcerCreate()
+        if not lib.LoadFullModelFromFile(self.handle, os.fsencode(cbm_path)):
+            raise RuntimeError(f"failed to load {cbm_path}: {self._error()}")
+        if not lib.SetPredictionTypeString(self.handle, b"Probability"):
+            raise RuntimeError(f"failed to set prediction type: {self._error()}")
+        self.n_classes = lib.GetDimensionsCount(self.handle)
+
+    def _error(self):
+        return self.lib.GetErrorString().decode("utf-8", "replace")
+
+    def predict_proba(self, X):
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows, n_features = X.shape
+        out = np.empty((n_rows, self.n_classes), dtype=np.float64)
+
+        # the C API takes one float* per document
+        row_ptr = ctypes.POINTER(ctypes.c_float)
+        rows = (row_ptr * n_rows)()
+        base = X.ctypes.data
+        stride = X.strides[0]
+        for i in range(n_rows):
+            rows[i] = ctypes.cast(base + i * stride, row_ptr)
+
+        ok = self.lib.CalcModelPredictionFlat(
+            self.handle,
+            n_rows,
+            rows,
+            n_features,
+            out.ctypes.data_as(ctypes.POINTER(ctypes.c_double)),
+            out.size,
+        )
+        if not ok:
+            raise RuntimeError(f"CalcModelPredictionFlat failed: {self._error()}")
+        return out
+
+    def __del__(self):
+        if getattr(self, "handle", None):
+            self.lib.ModelCalcerDelete(self.handle)
+            self.handle = None
+
+
+class OnnxBackend:
+    name = "onnx"
+    accepts_sparse = False
+
+    def __init__(self, onnx_path, threads=0):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+        # CatBoost exports ("label", "probabilities")
+        outputs = [o.name for o in self.session.get_outputs()]
+        self.output_name = "probabilities" if "probabilities" in outputs else outputs[-1]
+
+    def predict_proba(self, X):
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        probs = self.session.run([self.output_name], {self.input_name: X})[0]
+        if isinstance(probs, list):
+            # zipmap-style output: one {class: prob} dict per row
+            probs = np.array([[row[k] for k in sorted(row)] for row in probs])
+        return probs
+
+
+BACKENDS = ("catboost", "capi", "onnx")
+
+
+def make_backend(name, model=None, cbm_path=None, onnx_path=None, lib_path=None, threads=0):
+    if name == "catboost":
+        return CatBoostBackend(model)
+    if name == "capi":
+        if not lib_path:
+            raise ValueError("the capi backend needs CATBOOST_MODEL_LIB (path to libcatboostmodel)")
+        return CatBoostCApiBackend(cbm_path, lib_path)
+    if name == "onnx":
+        return OnnxBackend(onnx_path, threads)
+    raise ValueError(f"unknown inference backend {name!r}, expected one of {BACKENDS}")
@@ -0,0 +1,242 @@
+"""Request metrics in Prometheus text format, plus an opt-in stack sampler.
+
+``Metrics`` keeps per-stage latency histograms and a few counters behind
+one lock; ``stage(name)`` adds two ``perf_counter`` calls around a block.
+``MetricsMiddleware`` is a plain ASGI middleware that times every request
+and, when enabled, samples the stacks of all threads while a request is in
+flight and writes them as collapsed stacks (flamegraph.pl / speedscope).
+
+Counters are per process: behind gunicorn each worker reports its own.
+"""
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+from starlette.concurrency import run_in_threadpool
+
+# seconds; covers sub-millisecond stages up to slow requests
+BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels):
+    inner = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+    return "{" + inner + "}" if inner else ""
+
+
+class Histogram:
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.buckets[bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def render(self, name, **labels):
+        lines, cumulative = [], 0
+        for bound, n in zip(BUCKETS + ("+Inf",), self.buckets):
+            cumulative += n
+            lines.append(f"{name}_bucket{_labels(**labels, le=bound)} {cumulative}")
+        lines.append(f"{name}_sum{_labels(**labels)} {self.sum}")
+        lines.append(f"{name}_count{_labels(**labels)} {self.count}")
+        return lines
+
+
+class Metrics:
+    def __init__(self, prefix="disease_api"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.stages = defaultdict(Histogram)
+        self.requests = defaultdict(Histogram)  # (path, method) -> latency
+        self.responses = Counter()  # (path, status)
+        self.errors = Counter()  # (path, kind)
+        self.unknown_symptoms = 0
+        self.predicted = Counter()  # top-1 disease
+        self.model_load_seconds = None
+        self.model_loaded_at = None
+        self.profiles = 0
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.stages[name].observe(elapsed)
+
+    def observe_request(self, path, method, status, seconds):
+        with self._lock:
+            self.requests[(path, method)].observe(seconds)
+            self.responses[(path, status)] += 1
+            if status >= 400:
+                self.errors[(path, "server" if status >= 500 else "client")] += 1
+
+    def count_unknown(self, n):
+        if n:
+            with self._lock:
+                self.unknown_symptoms += n
+
+    def count_prediction(self, disease):
+        with self._lock:
+            self.predicted[disease] += 1
+
+    def model_loaded(self, seconds):
+        self.model_load_seconds = seconds
+        self.model_loaded_at = time.time()
+
+    def render(self, extra=()):
+        """Prometheus text exposition; ``extra`` is (name, type, help, [(labels, value)])."""
+        p = self.prefix
+        out = []
+
+        def family(name, kind, help_text, lines):
+            out.append(f"# HELP {p}_{name} {help_text}")
+            out.append(f"# TYPE {p}_{name} {kind}")
+            out.extend(lines)
+
+        with self._lock:
+            family("request_duration_seconds", "histogram", "Request latency by route.",
+                   [line for (path, method), h in sorted(self.requests.items())
+                    for line in h.render(f"{p}_request_duration_seconds", path=path, method=method)])
+            family("stage_duration_seconds", "histogram", "Time spent per request stage.",
+                   [line for name, h in sorted(self.stages.items())
+                    for line in h.render(f"{p}_stage_duration_seconds", stage=name)])
+            family("responses_total", "counter", "Responses by route and status code.",
+                   [f"{p}_responses_total{_labels(path=path, status=status)} {n}"
+                    for (path, status), n in sorted(self.responses.items())])
+            family("errors_total", "counter", "Error responses by route (client = 4xx, server = 5xx).",
+                   [f"{p}_errors_total{_labels(path=path, kind=kind)} {n}"
+                    for (path, kind), n in sorted(self.errors.items())])
+            family("unknown_symptoms_total", "counter", "Symptom names that matched no column.",
+                   [f"{p}_unknown_symptoms_total {self.unknown_symptoms}"])
+            family("predictions_total", "counter", "Top-1 predicted disease.",
+                   [f"{p}_predictions_total{_labels(disease=d)} {n}" for d, n in sorted(self.predicted.items())])
+            family("profiles_total", "counter", "Request profiles written.", [f"{p}_profiles_total {self.profiles}"])
+
+        if self.model_load_seconds is not None:
+            family("model_load_seconds", "gauge", "Time taken by the last model load.",
+                   [f"{p}_model_load_seconds {self.model_load_seconds}"])
+            family("model_loaded_timestamp_seconds", "gauge", "Unix time of the last model load.",
+                   [f"{p}_model_loaded_timestamp_seconds {self.model_loaded_at}"])
+        for name, kind, help_text, samples in extra:
+            family(name, kind, help_text, [f"{p}_{name}{_labels(**labels)} {value}" for labels, value in samples])
+        return "\n".join(out) + "\n"
+
+
+class StackSampler:
+    """Samples the stack of every thread every ``interval`` seconds until stopped."""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self.samples
+
+    def _run(self):
+        me = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.samples[";".join(reversed(stack))] += 1
+
+    def write(self, path):
+        with open(path, "w") as f:
+            for stack, n in self.samples.most_common():
+                f.write(f"{stack} {n}\n")
+
+
+class MetricsMiddleware:
+    """Times every HTTP request; optionally profiles some of them.
+
+    A request is profiled when ``profile_rate`` > 0 and it is randomly
+    picked, or when ``profile_header`` is on and the request carries
+    ``X-Profile: 1``. One profile runs at a time; the file name is
+    returned in the ``X-Profile-File`` response header.
+    """
+
+    def __init__(self, app, metrics, profile_dir="profiles", profile_rate=0.0,
+                 profile_header=False, profile_interval=0.005):
+        self.app = app
+        self.metrics = metrics
+        self.profile_dir = profile_dir
+        self.profile_rate = profile_rate
+        self.profile_header = profile_header
+        self.profile_interval = profile_interval
+        self._profiling = threading.Lock()
+
+    def _wants_profile(self, scope):
+        if self.profile_rate and random.random() < self.profile_rate:
+            return True
+        return self.profile_header and (b"x-profile", b"1") in scope.get("headers", ())
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        status = 500
+        sampler = profile_path = None
+        if (self.profile_rate or self.profile_header) and self._wants_profile(scope) \
+                and self._profiling.acquire(blocking=False):
+            profile_path = os.path.join(self.profile_dir, f"{int(time.time())}-{uuid.uuid4().hex[:8]}.collapsed")
+            sampler = StackSampler(self.profile_interval).start()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if profile_path:
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"x-profile-file", os.path.basename(profile_path).encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # the router sets scope["route"]; unmatched paths share one label
+            route = scope.get("route")
+            path = getattr(route, "path", "other")
+            self.metrics.observe_request(path, scope["method"], status, time.perf_counter() - start)
+            if sampler:
+                # joining the sampler thread and writing the file both block
+                await run_in_threadpool(self._finish_profile, sampler, profile_path)
+
+    def _finish_profile(self, sampler, path):
+        try:
+            sampler.stop()
+            os.makedirs(self.profile_dir, exist_ok=True)
+            sampler.write(path)
+            self.metrics.profiles += 1
+        finally:
+            self._profiling.release()
@@ -0,0 +1,102 @@
+"""Async micro-batcher that coalesces concurrent single-row predictions.
+
+Requests are queued and a single worker drains the queue, waiting at most
+``window_ms`` (or until ``max_batch_size`` requests are queued) before
+scoring everything collected with one call to ``score_fn``.
+"""
+import asyncio
+import time
+from collections import Counter
+
+import numpy as np
+
+
+class MicroBatcher:
+    def __init__(self, score_fn, window_ms=2.0, max_batch_size=64, max_queue=4096):
+        # score_fn takes a list of inputs and returns one result row per input
+        self.score_fn = score_fn
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self.max_queue = max_queue
+        self._queue = None
+        self._worker = None
+
+        # metrics
+        self.batch_sizes = Counter()
+        self.batches = 0
+        self.requests = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    async def start(self):
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._worker:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def submit(self, item):
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self):
+        # block for the first item, then fill the batch until the window closes
+        batch = [await self._queue.get()]
+        deadline = time.perf_counter() + self.window
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            items = [item for item, _, _ in batch]
+            started = time.perf_counter()
+            try:
+                results = await loop.run_in_executor(None, self.score_fn, items)
+            except Exception as e:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self._record(batch, started)
+            for (_, future, _), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def _record(self, batch, started):
+        # batch sizes are bucketed to powers of two for the histogram
+        self.batches += 1
+        self.requests += len(batch)
+        self.batch_sizes[1 << (len(batch) - 1).bit_length()] += 1
+        waits = np.array([started - enqueued for _, _, enqueued in batch])
+        self.wait_total += float(waits.sum())
+        self.wait_max = max(self.wait_max, float(waits.max()))
+
+    def stats(self):
+        return {
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "window_ms": self.window * 1000.0,
+            "max_batch_size": self.max_batch_size,
+            "batches": self.batches,
+            "requests": self.requests,
+            "mean_batch_size": self.requests / self.batches if self.batches else 0.0,
+            "batch_size_histogram": {f"<={k}": v for k, v in sorted(self.batch_sizes.items())},
+            "mean_wait_ms": self.wait_total / self.requests * 1000.0 if self.requests else 0.0,
+            "max_wait_ms": self.wait_max * 1000.0,
+        }
@@ -1,117 +1,518 @@
+"""Training pipeline for the CatBoost disease classifier.
 
-import pandas as pd
+Stages run in order and each one caches its output under --work-dir,
+keyed on its parameters and the stages before it. Re-running with the
+same settings skips straight to the first stage whose inputs changed,
+so trying new CatBoost hyperparameters does not re-parse the CSV:
+
+    python new.py                                 # full run, reusing any cached stages
+    python new.py --depth 6 --iterations 800      # only train/evaluate/export rerun
+    python new.py --from balance                  # force balance and later stages
+    python new.py --to reduce                     # stop after feature reduction
+
+tune.py runs a parallel search over the CatBoost parameters on the same
+cached split.
+
+Stages: parse, filter, balance, reduce, split, train, evaluate, export,
+compact. compact only runs when asked for, and writes smaller/faster
+variants of the model next to it (see compact_variants):
+
+    python new.py --compact-top-n 100 200 --compact-depths 5 --compact-trees 400
+
+The symptom matrix is ~99% zeros, so it is kept as a uint8 scipy CSR
+matrix through feature selection, splitting and CatBoost training
+(--dense restores the dense path).
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
 import pickle
+import time
+
+import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder
 from sklearn.feature_selection import VarianceThreshold
 from sklearn.metrics import accuracy_score
-from catboost import CatBoostClassifier
+from catboost import CatBoostClassifier, Pool
 
-# -------------------------------
-# 1. Load dataset
-# -------------------------------
-df = pd.read_csv("Disease and symptoms dataset.csv")
+from disease_meta import class_info
 
-# -------------------------------
-# 2. Filter diseases with ≥900 samples (adaptive selection)
-# -------------------------------
-counts = df['diseases'].value_counts()
-df_filtered = df[df['diseases'].isin(counts[counts >= 900].index)]
-print(f"✅ Using {df_filtered['diseases'].nunique()} diseases (each ≥900 samples)")
+STAGES = ["parse", "filter", "balance", "reduce", "split", "train", "evaluate", "export", "compact"]
 
-# -------------------------------
-# 3. Balance dataset (max 900 rows per disease)
-# -------------------------------
-balanced_df = (
-    df_filtered.groupby('diseases', group_keys=False)
-    .apply(lambda x: x.sample(n=min(len(x), 900), random_state=42))
-    .reset_index(drop=True)
-)
-print(f"✅ Balanced dataset shape: {balanced_df.shape}")
 
 # -------------------------------
-# 4. Features and labels
+# Stage cache
 # -------------------------------
-X = balanced_df.drop('diseases', axis=1).fillna(0)
-y = balanced_df['diseases']
+def stage_key(name, upstream, **params):
+    blob = json.dumps({"stage": name, "upstream": upstream, "params": params}, sort_keys=True)
+    return hashlib.sha1(blob.encode()).hexdigest()[:16]
 
-# -------------------------------
-# 5. Remove near-constant features
-# -------------------------------
-selector = VarianceThreshold(threshold=0.001)
-X_reduced = selector.fit_transform(X)
-reduced_features = X.columns[selector.get_support()].tolist()
-print(f"✅ Features reduced from {X.shape[1]} → {len(reduced_features)}")
 
-# -------------------------------
-# 6. Encode labels
-# -------------------------------
-le = LabelEncoder()
-y_enc = le.fit_transform(y)
+def save_npz(base, data):
+    # scipy CSR matrices are stored as their component arrays
+    arrays = {}
+    for name, value in data.items():
+        if hasattr(value, "tocsr"):
+            value = value.tocsr()
+            arrays.update({
+                f"{name}__csr_data": value.data, f"{name}__csr_indices": value.indices,
+                f"{name}__csr_indptr": value.indptr, f"{name}__csr_shape": np.array(value.shape),
+            })
+        else:
+            arrays[name] = value
+    np.savez(base + ".npz", **arrays)
 
-# -------------------------------
-# 7. Train-test split (stratified)
-# -------------------------------
-X_train, X_test, y_train, y_test = train_test_split(
-    X_reduced, y_enc, test_size=0.2, stratify=y_enc, random_state=42
-)
 
-# -------------------------------
-# 8. Identify categorical features (if any)
-# -------------------------------
-cat_features = [
-    i for i, c in enumerate(reduced_features)
-    if balanced_df[c].dtype == 'object'
-]
-print(f"✅ Categorical feature indices: {cat_features}")
+def load_npz(base):
+    with np.load(base + ".npz", allow_pickle=False) as f:
+        arrays = {k: f[k] for k in f.files}
+    data = {k: v for k, v in arrays.items() if "__csr_" not in k}
+    for key in [k for k in arrays if k.endswith("__csr_data")]:
+        from scipy import sparse as sp
 
-# -------------------------------
-# 9. Train CatBoost (hybrid-tuned)
-# -------------------------------
-model = CatBoostClassifier(
-    iterations=1100,
-    learning_rate=0.05,
-    depth=7,
-    l2_leaf_reg=3,
-    border_count=254,
-    random_strength=0.7,
-    colsample_bylevel=0.9,
-    subsample=0.85,
-    bootstrap_type='Bernoulli',
-    eval_metric='Accuracy',
-    auto_class_weights='Balanced',
-    random_seed=42,
-    verbose=150,
-    early_stopping_rounds=80
-)
-
-model.fit(X_train, y_train, cat_features=cat_features, eval_set=(X_test, y_test))
+        name = key[:-len("__csr_data")]
+        data[name] = sp.csr_matrix(
+            (arrays[key], arrays[f"{name}__csr_indices"], arrays[f"{name}__csr_indptr"]),
+            shape=tuple(arrays[f"{name}__csr_shape"]),
+        )
+    return data
+
+
+def save_json(base, data):
+    # base + ".json" is the stage's cache metadata
+    with open(base + ".result.json", "w") as f:
+        json.dump(data, f)
+
+
+def load_json(base):
+    with open(base + ".result.json") as f:
+        return json.load(f)
+
+
+def save_model(base, model):
+    model.save_model(base + ".cbm", format="cbm")
+
+
+def load_model(base):
+    model = CatBoostClassifier()
+    model.load_model(base + ".cbm", format="cbm")
+    return model
+
+
+class Pipeline:
+    def __init__(self, work_dir, rerun_from=None, stop_after=None):
+        self.work_dir = work_dir
+        os.makedirs(work_dir, exist_ok=True)
+        self.forced = set(STAGES[STAGES.index(rerun_from):]) if rerun_from else set()
+        self.stop_after = stop_after
+
+    def done(self, name):
+        # True once the --to stage has run
+        return self.stop_after is not None and STAGES.index(name) >= STAGES.index(self.stop_after)
+
+    def run(self, name, key, compute, save=save_npz, load=load_npz):
+        base = os.path.join(self.work_dir, name)
+        meta_path = base + ".json"
+        if name not in self.forced and os.path.exists(meta_path):
+            with open(meta_path) as f:
+                if json.load(f)["key"] == key:
+                    print(f"⏭️  {name}: cached ({key})")
+                    return load(base)
+
+        start = time.perf_counter()
+        result = compute()
+        save(base, result)
+        elapsed = time.perf_counter() - start
+        with open(meta_path, "w") as f:
+            json.dump({"key": key, "seconds": elapsed}, f)
+        print(f"✅ {name}: {elapsed:.1f}s ({key})")
+        return result
 
-# -------------------------------
-# 10. Evaluate accuracy
-# -------------------------------
-pred = model.predict(X_test)
-acc = accuracy_score(y_test, pred)
-print(f"\n✅ Final Test Accuracy: {acc:.4f}")
 
 # -------------------------------
-# 11. Save model and metadata
+# Stages
 # -------------------------------
-with open("disease_prediction_catboost_hybrid.pkl", "wb") as f:
-    pickle.dump({
-        "model": model,
-        "label_encoder": le,
-        "symptoms": reduced_features,
-        "accuracy": acc
-    }, f)
+def parse_csv(path, sparse=True, chunksize=20000):
+    # one pass over the CSV into a compact uint8 matrix: CSR by default, dense with --dense.
+    # Reading in chunks keeps only one chunk in pandas' float columns at a time.
+    import pandas as pd
+    from scipy import sparse as sp
+
+    features = [c for c in pd.read_csv(path, nrows=0).columns if c != "diseases"]
+    blocks, labels = [], []
+    for chunk in pd.read_csv(path, dtype={c: np.float32 for c in features}, chunksize=chunksize):
+        block = chunk[features].fillna(0).to_numpy(dtype=np.uint8)
+        blocks.append(sp.csr_matrix(block) if sparse else block)
+        labels.append(chunk["diseases"].astype(str).to_numpy(dtype=np.str_))
+    X = sp.vstack(blocks, format="csr") if sparse else np.concatenate(blocks)
+    y = np.concatenate(labels)
+
+    nbytes = X.data.nbytes + X.indices.nbytes + X.indptr.nbytes if sparse else X.nbytes
+    layout = f"CSR, {X.nnz / (X.shape[0] * X.shape[1]):.2%} non-zero" if sparse else "dense uint8"
+    print(f"✅ Parsed {X.shape[0]} rows x {X.shape[1]} symptoms ({nbytes / 1e6:.1f} MB, {layout})")
+    return {"X": X, "y": y, "features": np.array(features, dtype=np.str_)}
+
+
+def filter_classes(y, min_samples):
+    # keep diseases with ≥min_samples rows (adaptive selection)
+    classes, counts = np.unique(y, return_counts=True)
+    keep = classes[counts >= min_samples]
+    idx = np.flatnonzero(np.isin(y, keep))
+    print(f"✅ Using {len(keep)} diseases (each ≥{min_samples} samples)")
+    return {"idx": idx}
+
+
+def balance_classes(y, idx, max_samples, seed):
+    # at most max_samples rows per disease
+    rng = np.random.default_rng(seed)
+    labels = y[idx]
+    parts = []
+    for cls in np.unique(labels):
+        members = idx[labels == cls]
+        parts.append(np.sort(rng.choice(members, size=min(len(members), max_samples), replace=False)))
+    balanced = np.concatenate(parts)
+    print(f"✅ Balanced dataset: {len(balanced)} rows")
+    return {"idx": balanced}
+
+
+def reduce_features(X, idx, threshold):
+    # drop near-constant symptoms
+    selector = VarianceThreshold(threshold=threshold)
+    selector.fit(X[idx])
+    mask = selector.get_support()
+    print(f"✅ Features reduced from {X.shape[1]} → {int(mask.sum())}")
+    return {"mask": mask}
+
+
+def split_rows(y, idx, test_size, seed):
+    le = LabelEncoder()
+    y_enc = le.fit_transform(y[idx])
+    train_idx, test_idx, y_train, y_test = train_test_split(
+        idx, y_enc, test_size=test_size, stratify=y_enc, random_state=seed
+    )
+    return {
+        "train_idx": train_idx, "test_idx": test_idx,
+        "y_train": y_train, "y_test": y_test,
+        "classes": le.classes_.astype(np.str_),
+    }
+
+
+def catboost_params(args):
+    return dict(
+        iterations=args.iterations,
+        learning_rate=args.learning_rate,
+        depth=args.depth,
+        l2_leaf_reg=args.l2_leaf_reg,
+        border_count=args.border_count,
+        random_strength=0.7,
+        colsample_bylevel=0.9,
+        subsample=0.85,
+        bootstrap_type='Bernoulli',
+        eval_metric='Accuracy',
+        auto_class_weights='Balanced',
+        random_seed=args.seed,
+        early_stopping_rounds=80,
+    )
+
+
+def train_model(X_train, y_train, X_test, y_test, params, thread_count, verbose=150):
+    # Pool takes the CSR matrix as is, no densifying
+    model = CatBoostClassifier(**params, thread_count=thread_count, verbose=verbose)
+    model.fit(Pool(X_train, y_train), eval_set=Pool(X_test, y_test))
+    return model
+
+
+def evaluate_model(model, X_test, y_test):
+    acc = accuracy_score(y_test, model.predict(X_test).ravel())
+    print(f"\n✅ Final Test Accuracy: {acc:.4f}")
+    return {"accuracy": np.float64(acc)}
+
+
+def save_onnx(model, path):
+    model.save_model(
+        path,
+        format="onnx",
+        export_parameters={"onnx_domain": "ai.catboost", "onnx_model_version": 1,
+                           "onnx_doc_string": "LifeAura disease classifier"},
+    )
+
+
+def export_artifacts(model, classes, features, acc, class_counts, out_dir):
+    classes = [str(c) for c in classes]
+    features = [str(f) for f in features]
+    le = LabelEncoder()
+    le.classes_ = np.array(classes, dtype=object)
+
+    with open(os.path.join(out_dir, "disease_prediction_catboost_hybrid.pkl"), "wb") as f:
+        pickle.dump({
+            "model": model,
+            "label_encoder": le,
+            "symptoms": features,
+            "accuracy": acc
+        }, f)
+    print("💾 Model saved to disease_prediction_catboost_hybrid.pkl")
+
+    # Native CatBoost model + JSON sidecar for fast serving (no pickle/sklearn)
+    model.save_model(os.path.join(out_dir, "disease_prediction_catboost.cbm"), format="cbm")
+    with open(os.path.join(out_dir, "disease_prediction_meta.json"), "w") as f:
+        json.dump({
+            "classes": classes,
+            "symptoms": features,
+            "accuracy": acc,
+            "diseases": [
+                {"disease": d, "specialist": sp, "severity": sev}
+                for d, sp, sev in class_info(classes)
+            ],
+        }, f)
+    print("💾 Native model saved to disease_prediction_catboost.cbm (+ disease_prediction_meta.json)")
+
+    # ONNX export for the onnx inference backend
+    save_onnx(model, os.path.join(out_dir, "disease_prediction_catboost.onnx"))
+    print("💾 ONNX model saved to disease_prediction_catboost.onnx")
+
+    # disease counts (for the Streamlit app)
+    with open(os.path.join(out_dir, "disease_list_with_counts.csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Disease", "Sample_Count"])
+        for disease, count in sorted(class_counts.items(), key=lambda kv: -kv[1]):
+            writer.writerow([disease, count])
+    print("📄 Disease list saved as disease_list_with_counts.csv")
+
+
+def time_predict(model, X, repeats):
+    # median seconds per predict_proba call
+    model.predict_proba(X)  # warm up
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict_proba(X)
+        times.append(time.perf_counter() - start)
+    return float(np.median(times))
+
+
+def measure_variant(model, X_test, y_test, path, repeats=200):
+    load_seconds = []
+    for _ in range(3):
+        start = time.perf_counter()
+        CatBoostClassifier().load_model(path, format="cbm")
+        load_seconds.append(time.perf_counter() - start)
+    batch = X_test[:512]
+    return {
+        "accuracy": float(accuracy_score(y_test, model.predict(X_test).ravel())),
+        "model_mb": os.path.getsize(path) / 1e6,
+        "load_ms": min(load_seconds) * 1000,
+        "latency_ms_single": time_predict(model, X_test[:1], repeats) * 1000,
+        "batch_rows_per_sec": batch.shape[0] / time_predict(model, batch, max(5, repeats // 20)),
+    }
+
+
+def compact_variants(model, X_train, y_train, X_test, y_test, classes, features, params, args):
+    """Train and measure smaller/faster variants of the model.
+
+    - topN: retrained on the N symptoms with the highest feature importance
+    - depthD: retrained with shallower trees
+    - treesT: the trained model cut to its first T trees (no retraining)
+
+    Each variant (and the full model, for comparison) is written to
+    <out-dir>/model_variants/<name>/ and can be served with
+    MODEL_VARIANT=<name>. Pruned variants keep the full symptom list in
+    their meta.json plus the model_columns they use.
+    """
+    root = os.path.join(args.out_dir, "model_variants")
+    classes = [str(c) for c in classes]
+    features = [str(f) for f in features]
+    ranked = np.argsort(model.get_feature_importance())[::-1]
+
+    def retrain(cols=None, p=params):
+        Xtr, Xte = (X_train, X_test) if cols is None else (X_train[:, cols], X_test[:, cols])
+        return train_model(Xtr, y_train, Xte, y_test, p, args.thread_count, verbose=0)
+
+    def shrink(trees):
+        small = model.copy()
+        small.shrink(trees)
+        return small
+
+    # (name, build, pruned columns or None, params)
+    candidates = [("full", lambda: model, None, params)]
+    for n in args.compact_top_n:
+        if n < len(features):
+            cols = sorted(ranked[:n].tolist())
+            candidates.append((f"top{n}", lambda cols=cols: retrain(cols), cols, params))
+    for depth in args.compact_depths:
+        p = {**params, "depth": depth}
+        candidates.append((f"depth{depth}", lambda p=p: retrain(p=p), None, p))
+    for trees in args.compact_trees:
+        if trees < model.tree_count_:
+            candidates.append((f"trees{trees}", lambda trees=trees: shrink(trees), None, params))
+
+    report = []
+    for name, build, cols, p in candidates:
+        start = time.perf_counter()
+        variant = build()
+        build_seconds = time.perf_counter() - start
+
+        out = os.path.join(root, name)
+        os.makedirs(out, exist_ok=True)
+        path = os.path.join(out, "model.cbm")
+        variant.save_model(path, format="cbm")
+        save_onnx(variant, os.path.join(out, "model.onnx"))
+        row = {
+            "variant": name,
+            "features": len(cols) if cols is not None else len(features),
+            "trees": int(variant.tree_count_),
+            "depth": p["depth"],
+            "build_seconds": build_seconds,
+            **measure_variant(variant, X_test if cols is None else X_test[:, cols], y_test, path),
+        }
+        meta = {
+            "classes": classes,
+            "symptoms": features,
+            "accuracy": row["accuracy"],
+            "diseases": [{"disease": d, "specialist": sp, "severity": sev} for d, sp, sev in class_info(classes)],
+            "variant": name,
+        }
+        if cols is not None:
+            meta["model_columns"] = cols
+        with open(os.path.join(out, "meta.json"), "w") as f:
+            json.dump(meta, f)
+        report.append(row)
+        print(f"✅ {name}: acc {row['accuracy']:.4f}, {row['model_mb']:.1f} MB, load {row['load_ms']:.0f} ms, "
+              f"{row['latency_ms_single']:.2f} ms/row")
+
+    # fastest single-row variant within --compact-max-drop of the full model
+    floor = report[0]["accuracy"] - args.compact_max_drop
+    recommended = min((r for r in report if r["accuracy"] >= floor), key=lambda r: r["latency_ms_single"])["variant"]
+
+    with open(os.path.join(root, "report.json"), "w") as f:
+        json.dump({"recommended": recommended, "variants": report}, f, indent=2)
+    with open(os.path.join(root, "report.csv"), "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(report[0]))
+        writer.writeheader()
+        writer.writerows(report)
+    print(f"📄 Variant report saved to {os.path.join(root, 'report.csv')}")
+    print(f"➡️  Recommended: {recommended} (serve with MODEL_VARIANT={recommended})")
+    return {"recommended": recommended, "variants": report}
 
-print("💾 Model saved to disease_prediction_catboost_hybrid.pkl")
 
 # -------------------------------
-# 12. Save disease counts (for Streamlit app)
+# CLI
 # -------------------------------
-disease_counts = balanced_df['diseases'].value_counts().reset_index()
-disease_counts.columns = ['Disease', 'Sample_Count']
-disease_counts.to_csv("disease_list_with_counts.csv", index=False)
-print("📄 Disease list saved as disease_list_with_counts.csv")
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", default="Disease and symptoms dataset.csv")
+    parser.add_argument("--work-dir", default="pipeline_cache")
+    parser.add_argument("--out-dir", default=".")
+    parser.add_argument("--from", dest="rerun_from", choices=STAGES, help="force this stage and later ones to rerun")
+    parser.add_argument("--to", dest="stop_after", choices=STAGES, help="stop after this stage")
+    parser.add_argument("--dense", action="store_true", help="keep the symptom matrix dense instead of CSR")
+    parser.add_argument("--thread-count", type=int, default=-1, help="CatBoost threads (-1 = all cores)")
+    parser.add_argument("--min-samples", type=int, default=900)
+    parser.add_argument("--max-samples", type=int, default=900)
+    parser.add_argument("--variance-threshold", type=float, default=0.001)
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--iterations", type=int, default=1100)
+    parser.add_argument("--learning-rate", type=float, default=0.05)
+    parser.add_argument("--depth", type=int, default=7)
+    parser.add_argument("--l2-leaf-reg", type=float, default=3)
+    parser.add_argument("--border-count", type=int, default=254)
+    parser.add_argument("--compact-top-n", type=int, nargs="*", default=[], metavar="N",
+                        help="compact: retrain on the N most important symptoms")
+    parser.add_argument("--compact-depths", type=int, nargs="*", default=[], metavar="D",
+                        help="compact: retrain with this tree depth")
+    parser.add_argument("--compact-trees", type=int, nargs="*", default=[], metavar="T",
+                        help="compact: keep only the first T trees")
+    parser.add_argument("--compact-max-drop", type=float, default=0.005,
+                        help="accuracy a recommended variant may lose against the full model")
+    return parser.parse_args(argv)
+
+
+def prepare(args, pipe):
+    """Run (or load from cache) parse through split.
+
+    Returns None when --to stops the pipeline at or before split, else a
+    dict with the train/test matrices and everything export needs.
+    """
+    # the parse cache is invalidated when the CSV itself changes
+    st = os.stat(args.csv)
+    k = stage_key("parse", None, csv=os.path.abspath(args.csv), mtime=st.st_mtime_ns, size=st.st_size,
+                  sparse=not args.dense)
+    data = pipe.run("parse", k, lambda: parse_csv(args.csv, sparse=not args.dense))
+    X, y, features = data["X"], data["y"], data["features"]
+    if pipe.done("parse"):
+        return None
+
+    k = stage_key("filter", k, min_samples=args.min_samples)
+    idx = pipe.run("filter", k, lambda: filter_classes(y, args.min_samples))["idx"]
+    if pipe.done("filter"):
+        return None
+
+    k = stage_key("balance", k, max_samples=args.max_samples, seed=args.seed)
+    idx = pipe.run("balance", k, lambda: balance_classes(y, idx, args.max_samples, args.seed))["idx"]
+    if pipe.done("balance"):
+        return None
+
+    k = stage_key("reduce", k, threshold=args.variance_threshold)
+    mask = pipe.run("reduce", k, lambda: reduce_features(X, idx, args.variance_threshold))["mask"]
+    X_reduced = X[:, mask]
+    if pipe.done("reduce"):
+        return None
+
+    k = stage_key("split", k, test_size=args.test_size, seed=args.seed)
+    split = pipe.run("split", k, lambda: split_rows(y, idx, args.test_size, args.seed))
+    if pipe.done("split"):
+        return None
+
+    classes, counts = np.unique(y[idx], return_counts=True)
+    return {
+        "key": k,
+        "X_train": X_reduced[split["train_idx"]], "X_test": X_reduced[split["test_idx"]],
+        "y_train": split["y_train"], "y_test": split["y_test"],
+        "classes": split["classes"], "features": features[mask],
+        "class_counts": dict(zip(classes.tolist(), counts.tolist())),
+    }
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    pipe = Pipeline(args.work_dir, args.rerun_from, args.stop_after)
+    ds = prepare(args, pipe)
+    if ds is None:
+        return
+    X_train, X_test, y_test = ds["X_train"], ds["X_test"], ds["y_test"]
+
+    # thread_count only changes speed, not the model, so it is not part of the key
+    params = catboost_params(args)
+    k = stage_key("train", ds["key"], **params)
+    model = pipe.run(
+        "train", k,
+        lambda: train_model(X_train, ds["y_train"], X_test, y_test, params, args.thread_count),
+        save=save_model, load=load_model,
+    )
+    if pipe.done("train"):
+        return
+
+    k = stage_key("evaluate", k)
+    acc = float(pipe.run("evaluate", k, lambda: evaluate_model(model, X_test, y_test))["accuracy"])
+    if pipe.done("evaluate"):
+        return
+
+    export_artifacts(model, ds["classes"], ds["features"], acc, ds["class_counts"], args.out_dir)
+    if pipe.done("export") or not (args.compact_top_n or args.compact_depths or args.compact_trees):
+        return
+
+    k = stage_key("compact", k, out_dir=os.path.abspath(args.out_dir), top_n=args.compact_top_n,
+                  depths=args.compact_depths, trees=args.compact_trees, max_drop=args.compact_max_drop)
+    pipe.run(
+        "compact", k,
+        lambda: compact_variants(model, X_train, ds["y_train"], X_test, y_test,
+                                 ds["classes"], ds["features"], params, args),
+        save=save_json, load=load_json,
+    )
+
 
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+"""Pre-fork entrypoint: load the model once in the gunicorn master.
+
+With ``preload_app = True`` gunicorn imports this module before forking,
+so every worker shares the model pages copy-on-write instead of loading
+its own copy. See gunicorn.conf.py.
+
+    gunicorn -c gunicorn.conf.py serve:app
+"""
+import gc
+
+import api_server
+
+api_server.load_resources()
+
+# move everything loaded so far out of the GC's tracked generations, so
+# collections in the workers don't write to (and un-share) those pages
+gc.freeze()
+
+app = api_server.app
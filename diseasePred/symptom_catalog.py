@@ -0,0 +1,104 @@
+"""Precomputed /symptoms payload and a search index over the vocabulary.
+
+Built once per model load: the JSON body (plus gzip and, when the
+``brotli`` package is installed, brotli encodings), an ETag derived from
+the model artifact and the payload, and two indexes for autocomplete:
+
+- word prefix: every word start of every symptom ("pain" finds
+  "sharp abdominal pain"), as a sorted list searched with bisect
+- substring: a trigram -> symptom ids map; candidates are verified
+  against the full name
+"""
+import gzip
+import hashlib
+import json
+from bisect import bisect_left
+from collections import defaultdict
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+from inference import normalize_symptom
+
+
+def file_digest(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class SymptomCatalog:
+    def __init__(self, symptoms, accuracy, artifact):
+        self.symptoms = list(symptoms)
+        self.body = json.dumps({"symptoms": self.symptoms, "accuracy": accuracy}, separators=(",", ":")).encode()
+        self.encodings = {"gzip": gzip.compress(self.body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            self.encodings["br"] = brotli.compress(self.body)
+        digest = hashlib.sha256(file_digest(artifact).encode() + self.body).hexdigest()
+        # weak: the same tag covers the identity, gzip and brotli bodies
+        self.etag = f'W/"{digest[:32]}"'
+
+        self.normalized = [normalize_symptom(s) for s in self.symptoms]
+        # (word-start suffix, symptom id), sorted for bisect
+        self._prefixes = sorted(
+            (name[i:], sid)
+            for sid, name in enumerate(self.normalized)
+            for i in [0] + [j + 1 for j, ch in enumerate(name) if ch == " "]
+        )
+        self._trigrams = defaultdict(set)
+        for sid, name in enumerate(self.normalized):
+            for gram in _trigrams(name):
+                self._trigrams[gram].add(sid)
+
+    def encode(self, accept_encoding):
+        """(body, content-encoding or None) for an Accept-Encoding header."""
+        accepted = set()
+        for part in (accept_encoding or "").split(","):
+            coding, _, params = part.strip().partition(";")
+            params = params.strip()
+            try:
+                weight = float(params[2:]) if params.startswith("q=") else 1.0
+            except ValueError:
+                weight = 0.0
+            if coding and weight > 0:
+                accepted.add(coding.lower())
+        for coding in ("br", "gzip"):
+            if coding in self.encodings and (coding in accepted or "*" in accepted):
+                return self.encodings[coding], coding
+        return self.body, None
+
+    def matches_etag(self, if_none_match):
+        if not if_none_match:
+            return False
+        tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+        return "*" in tags or self.etag.removeprefix("W/") in tags
+
+    def search(self, query, match="prefix", limit=20):
+        """Symptoms matching ``query``; names starting with it come first."""
+        q = normalize_symptom(query)
+        if not q:
+            return []
+        if match == "prefix":
+            ids = set()
+            i = bisect_left(self._prefixes, (q,))
+            while i < len(self._prefixes) and self._prefixes[i][0].startswith(q):
+                ids.add(self._prefixes[i][1])
+                i += 1
+        elif len(q) < 3:
+            ids = {sid for sid, name in enumerate(self.normalized) if q in name}
+        else:
+            grams = sorted(_trigrams(q), key=lambda g: len(self._trigrams.get(g, ())))
+            ids = set(self._trigrams.get(grams[0], ()))
+            for gram in grams[1:]:
+                ids &= self._trigrams.get(gram, set())
+            ids = {sid for sid in ids if q in self.normalized[sid]}
+        ranked = sorted(ids, key=lambda sid: (not self.normalized[sid].startswith(q), self.normalized[sid]))
+        return [self.symptoms[sid] for sid in ranked[:limit]]
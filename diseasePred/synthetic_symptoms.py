@@ -0,0 +1,80 @@
+"""Synthetic symptom sets for benchmarks and load tests.
+
+Diseases are drawn in proportion to their Sample_Count in
+disease_list_with_counts.csv. Each disease gets a fixed "signature" of
+symptoms (derived from the seed and the disease name, so it is the same
+on every run), and a generated case is a random subset of that signature
+plus, now and then, an unrelated symptom. Repeated cases of common
+diseases therefore overlap the way real traffic does, which matters for
+the prediction cache, unlike uniformly random symptom sets.
+
+    python synthetic_symptoms.py --symptoms-from http://127.0.0.1:5000 -n 5
+"""
+import argparse
+import csv
+import json
+import random
+import urllib.request
+import zlib
+
+COUNTS_PATH = "disease_list_with_counts.csv"
+
+
+def load_disease_counts(path=COUNTS_PATH):
+    with open(path, newline="") as f:
+        return [(row["Disease"], int(row["Sample_Count"])) for row in csv.DictReader(f)]
+
+
+class SymptomSetGenerator:
+    def __init__(self, symptoms, counts_path=COUNTS_PATH, seed=42,
+                 signature_size=(3, 8), noise=0.15, max_symptoms=6):
+        self.symptoms = list(symptoms)
+        counts = load_disease_counts(counts_path)
+        self.diseases = [d for d, _ in counts]
+        self.weights = [c for _, c in counts]
+        self.noise = noise
+        self.max_symptoms = max_symptoms
+        self.rng = random.Random(seed)
+        self.signatures = {}
+        for disease in self.diseases:
+            r = random.Random(seed ^ zlib.crc32(disease.encode()))
+            self.signatures[disease] = r.sample(self.symptoms, r.randint(*signature_size))
+
+    def case(self):
+        """One (disease, symptom list) pair."""
+        disease = self.rng.choices(self.diseases, self.weights)[0]
+        signature = self.signatures[disease]
+        n = self.rng.randint(1, min(len(signature), self.max_symptoms))
+        symptoms = self.rng.sample(signature, n)
+        if self.rng.random() < self.noise:
+            extra = self.rng.choice(self.symptoms)
+            if extra not in symptoms:
+                symptoms.append(extra)
+        return disease, symptoms
+
+    def batch(self, n):
+        return [self.case()[1] for _ in range(n)]
+
+
+def fetch_symptoms(base_url):
+    with urllib.request.urlopen(f"{base_url}/symptoms", timeout=10) as r:
+        return json.load(r)["symptoms"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symptoms-from", metavar="URL", help="read the vocabulary from a running API")
+    parser.add_argument("-n", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.symptoms_from:
+        vocabulary = fetch_symptoms(args.symptoms_from)
+    else:
+        from inference import DiseaseModel
+
+        vocabulary = DiseaseModel.load().symptoms
+    gen = SymptomSetGenerator(vocabulary, seed=args.seed)
+    for _ in range(args.n):
+        disease, symptoms = gen.case()
+        print(json.dumps({"disease": disease, "symptoms": symptoms}))
@@ -0,0 +1,188 @@
+"""Parallel grid / random search over the CatBoost parameters in new.py.
+
+Runs the parse..split stages of new.py once (reusing its stage cache),
+writes the train/test matrices as .npy files that every worker memory-maps
+instead of receiving a pickled copy, then fits one model per trial in a
+process pool. Cores are split evenly across the concurrent fits.
+
+    python tune.py --param depth=4,6,7 --param learning_rate=0.05,0.1 --jobs 4
+    python tune.py --param depth=4,5,6,7,8 --param iterations=300,600,1100 --samples 6
+
+Any other option is passed through to new.py (--csv, --min-samples, --dense,
+the baseline --depth/--iterations, ...). Results are ranked by accuracy and
+written to <work-dir>/tune/leaderboard.csv and leaderboard.json with train
+time, model size and single-row / batch inference latency.
+"""
+import argparse
+import csv
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+import new
+
+_SHARED = {}
+
+
+# -------------------------------
+# Memory-mapped dataset
+# -------------------------------
+def write_shared(out_dir, ds):
+    # one .npy per array; CSR matrices as their data/indices/indptr/shape
+    os.makedirs(out_dir, exist_ok=True)
+    for name in ("X_train", "X_test", "y_train", "y_test"):
+        value = ds[name]
+        if hasattr(value, "tocsr"):
+            value = value.tocsr()
+            parts = {"data": value.data, "indices": value.indices,
+                     "indptr": value.indptr, "shape": np.array(value.shape)}
+            for part, arr in parts.items():
+                np.save(os.path.join(out_dir, f"{name}.{part}.npy"), arr)
+        else:
+            np.save(os.path.join(out_dir, f"{name}.npy"), value)
+
+
+def load_shared(data_dir):
+    def load(name):
+        path = os.path.join(data_dir, f"{name}.npy")
+        if os.path.exists(path):
+            return np.load(path, mmap_mode="r")
+        from scipy import sparse as sp
+
+        # copy-on-write: CatBoost's Pool needs writable buffers for CSR input,
+        # pages are still shared until (and unless) something writes to them
+        parts = {p: np.load(os.path.join(data_dir, f"{name}.{p}.npy"), mmap_mode="c")
+                 for p in ("data", "indices", "indptr")}
+        shape = tuple(np.load(os.path.join(data_dir, f"{name}.shape.npy")))
+        return sp.csr_matrix((parts["data"], parts["indices"], parts["indptr"]), shape=shape, copy=False)
+
+    return {name: load(name) for name in ("X_train", "X_test", "y_train", "y_test")}
+
+
+def _init_worker(data_dir):
+    _SHARED.update(load_shared(data_dir))
+
+
+# -------------------------------
+# Trials
+# -------------------------------
+def parse_param(spec, base):
+    # "depth=4,6,7" -> ("depth", [4, 6, 7]), typed like the baseline value
+    name, _, values = spec.partition("=")
+    if name not in base or not values:
+        raise SystemExit(f"--param {spec!r}: expected NAME=V1,V2,... with NAME one of {sorted(base)}")
+    cast = type(base[name])
+    return name, [cast(v) for v in values.split(",")]
+
+
+def build_trials(grid, base, samples, seed):
+    names = list(grid)
+    combos = list(itertools.product(*(grid[n] for n in names)))
+    if samples and samples < len(combos):
+        combos = random.Random(seed).sample(combos, samples)
+    return [{**base, **dict(zip(names, combo))} for combo in combos]
+
+
+def run_trial(trial, params, thread_count, model_dir, latency_repeats):
+    d = _SHARED
+    start = time.perf_counter()
+    model = new.train_model(d["X_train"], d["y_train"], d["X_test"], d["y_test"], params, thread_count, verbose=0)
+    train_seconds = time.perf_counter() - start
+
+    acc = float(new.evaluate_model(model, d["X_test"], d["y_test"])["accuracy"])
+    model_path = os.path.join(model_dir, f"trial_{trial:03d}.cbm")
+    model.save_model(model_path, format="cbm")
+
+    batch = d["X_test"][:512]
+    batch_seconds = new.time_predict(model, batch, latency_repeats)
+    return {
+        "trial": trial,
+        "accuracy": acc,
+        "train_seconds": train_seconds,
+        "best_iteration": model.get_best_iteration(),
+        "model_mb": os.path.getsize(model_path) / 1e6,
+        "latency_ms_single": new.time_predict(model, d["X_test"][:1], latency_repeats) * 1000,
+        "batch_rows_per_sec": batch.shape[0] / batch_seconds,
+        "model_path": model_path,
+        "params": params,
+    }
+
+
+def write_leaderboard(results, out_dir):
+    results = sorted(results, key=lambda r: (-r["accuracy"], r["latency_ms_single"]))
+    with open(os.path.join(out_dir, "leaderboard.json"), "w") as f:
+        json.dump(results, f, indent=2)
+
+    param_names = sorted({name for r in results for name in r["params"]})
+    columns = ["rank", "trial", "accuracy", "train_seconds", "best_iteration", "model_mb",
+               "latency_ms_single", "batch_rows_per_sec"]
+    with open(os.path.join(out_dir, "leaderboard.csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns + param_names + ["model_path"])
+        for rank, r in enumerate(results, 1):
+            row = {**r, "rank": rank}
+            writer.writerow([row[c] for c in columns] + [r["params"][p] for p in param_names] + [r["model_path"]])
+    return results
+
+
+# -------------------------------
+# CLI
+# -------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--param", action="append", default=[], metavar="NAME=V1,V2",
+                        help="values to search for one CatBoost parameter (repeatable)")
+    parser.add_argument("--samples", type=int, default=0, help="random search: try this many grid points (0 = all)")
+    parser.add_argument("--jobs", type=int, default=2, help="concurrent fits")
+    parser.add_argument("--latency-repeats", type=int, default=50)
+    tune_args, rest = parser.parse_known_args(argv)
+    args = new.parse_args(rest)
+
+    base = new.catboost_params(args)
+    grid = dict(parse_param(spec, base) for spec in tune_args.param) or {
+        "depth": [4, 6, 7], "learning_rate": [0.05, 0.1], "iterations": [400, 1100],
+    }
+    trials = build_trials(grid, base, tune_args.samples, args.seed)
+
+    pipe = new.Pipeline(args.work_dir, args.rerun_from)
+    ds = new.prepare(args, pipe)
+    out_dir = os.path.join(args.work_dir, "tune")
+    data_dir = os.path.join(out_dir, f"data_{ds['key']}")
+    if not os.path.isdir(data_dir):
+        write_shared(data_dir, ds)
+    del ds
+    model_dir = os.path.join(out_dir, "models")
+    os.makedirs(model_dir, exist_ok=True)
+
+    cores = os.cpu_count() or 1
+    jobs = max(1, min(tune_args.jobs, len(trials), cores))
+    thread_count = max(1, cores // jobs)
+    print(f"🔎 {len(trials)} trials, {jobs} at a time x {thread_count} threads")
+
+    results = []
+    # spawn: workers share the dataset only through the memory-mapped files
+    with ProcessPoolExecutor(jobs, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_worker, initargs=(data_dir,)) as pool:
+        futures = [pool.submit(run_trial, i, params, thread_count, model_dir, tune_args.latency_repeats)
+                   for i, params in enumerate(trials)]
+        for future in as_completed(futures):
+            r = future.result()
+            results.append(r)
+            print(f"✅ trial {r['trial']:>3}: acc {r['accuracy']:.4f}, {r['train_seconds']:.1f}s, "
+                  f"{r['model_mb']:.1f} MB, {r['latency_ms_single']:.2f} ms/row")
+
+    results = write_leaderboard(results, out_dir)
+    print(f"\n📄 Leaderboard saved to {os.path.join(out_dir, 'leaderboard.csv')} (+ .json)")
+    for rank, r in enumerate(results[:5], 1):
+        changed = {k: v for k, v in r["params"].items() if base.get(k) != v}
+        print(f"{rank}. acc {r['accuracy']:.4f}  {r['latency_ms_single']:.2f} ms/row  {changed or 'baseline'}")
+
+
+if __name__ == "__main__":
+    main()
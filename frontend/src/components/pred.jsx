@@ -6,6 +6,7 @@ export default function Pred() {
   const [symptoms, setSymptoms] = useState([]);
   const [options, setOptions] = useState([]);
   const [filter, setFilter] = useState("");
+  const [matches, setMatches] = useState(null);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState("");
   const [result, setResult] = useState(null);
@@ -104,6 +105,34 @@ export default function Pred() {
     };
   }, []);
 
+  // search on the model server while typing (debounced); the full list is
+  // only used as a fallback filter if the search fails
+  useEffect(() => {
+    const q = filter.trim();
+    if (!q) {
+      setMatches(null);
+      return;
+    }
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      try {
+        const res = await api.get("/predict/symptoms", {
+          params: { q, match: "substring", limit: 200 },
+        });
+        const data = res?.data?.data || res?.data;
+        if (!cancelled && Array.isArray(data?.symptoms)) {
+          setMatches(data.symptoms);
+        }
+      } catch (err) {
+        if (!cancelled) setMatches(null);
+      }
+    }, 150);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [filter]);
+
   const toggleOption = (opt) => {
     setSymptoms((s) =>
       s.includes(opt) ? s.filter((x) => x !== opt) : [...s, opt]
@@ -145,8 +174,12 @@ export default function Pred() {
         </div>
 
         <div className="grid grid-cols-2 gap-2 max-h-44 overflow-auto mb-2">
-          {(options || [])
-            .filter((o) => o.toLowerCase().includes(filter.toLowerCase()))
+          {(
+            matches ||
+            (options || []).filter((o) =>
+              o.toLowerCase().includes(filter.toLowerCase())
+            )
+          )
             .slice(0, 200)
             .map((opt) => (
               <label
@@ -0,0 +1,51 @@
+"""Per-request upload handling cost: temp-file round trip vs in-memory.
+
+Times only the part of /extract before the vision call, for a few image
+sizes: the old path saved the upload to the temp dir and read it back,
+the new one base64-encodes the in-memory buffer directly.
+
+    python bench_extract.py
+"""
+import base64
+import io
+import os
+import tempfile
+import time
+
+from werkzeug.datastructures import FileStorage
+
+from test_server_pythonic import encode_image, read_image
+
+
+def old_path(data):
+    image_file = FileStorage(stream=io.BytesIO(data), filename="upload.jpg")
+    tmp_path = os.path.join(tempfile.gettempdir(), "upload.jpg")
+    image_file.save(tmp_path)
+    with open(tmp_path, "rb") as f:
+        return base64.b64encode(f.read()).decode("utf-8")
+
+
+def new_path(data):
+    image_file = FileStorage(stream=io.BytesIO(data), filename="upload.jpg")
+    return encode_image(read_image(image_file))
+
+
+def per_call_ms(fn, data, repeats):
+    fn(data)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn(data)
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def main(repeats=50):
+    print(f"{'size':>8} {'temp file':>12} {'in memory':>12} {'saved':>10}")
+    for size_kb in (256, 1024, 4096, 8192):
+        data = os.urandom(size_kb * 1024)
+        old_ms = per_call_ms(old_path, data, repeats)
+        new_ms = per_call_ms(new_path, data, repeats)
+        print(f"{size_kb:>6}KB {old_ms:>10.2f}ms {new_ms:>10.2f}ms {old_ms - new_ms:>8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,12 @@
+import os
+
+# gevent workers: each worker serves many requests concurrently while they
+# wait on the vision model, instead of one request per thread/process
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_class = "gevent"
+worker_connections = int(os.getenv("WORKER_CONNECTIONS", "256"))
+
+timeout = 120
+graceful_timeout = 30
+keepalive = 5
@@ -0,0 +1,93 @@
+"""Shrink prescription photos before they are sent to the vision model.
+
+Phone photos are decoded, rotated according to their EXIF orientation,
+downscaled so the longest edge is at most IMAGE_MAX_EDGE, optionally
+converted to auto-contrasted grayscale (text reads fine without colour),
+and re-encoded as JPEG or WebP.
+"""
+import io
+import os
+import threading
+
+from PIL import Image, ImageOps
+
+IMAGE_PREPROCESS = os.getenv("IMAGE_PREPROCESS", "1") == "1"
+IMAGE_MAX_EDGE = int(os.getenv("IMAGE_MAX_EDGE", "1600"))
+IMAGE_GRAYSCALE = os.getenv("IMAGE_GRAYSCALE", "1") == "1"
+# jpeg or webp
+IMAGE_FORMAT = os.getenv("IMAGE_FORMAT", "jpeg").lower()
+IMAGE_QUALITY = int(os.getenv("IMAGE_QUALITY", "80"))
+
+_MIME = {"jpeg": "image/jpeg", "webp": "image/webp"}
+
+
+class ImageStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.images = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.passthrough = 0
+
+    def record(self, bytes_in, bytes_out, passthrough):
+        with self._lock:
+            self.images += 1
+            self.bytes_in += bytes_in
+            self.bytes_out += bytes_out
+            self.passthrough += int(passthrough)
+
+    def snapshot(self):
+        return {
+            "images": self.images,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "passthrough": self.passthrough,
+            "ratio": self.bytes_out / self.bytes_in if self.bytes_in else 0.0,
+        }
+
+
+STATS = ImageStats()
+
+
+def detect_mime(image):
+    return Image.MIME.get(image.format, "image/jpeg")
+
+
+def prepare_image(image_bytes):
+    """Return (bytes, mime) ready for a data: URL. Raises ValueError if undecodable."""
+    try:
+        image = Image.open(io.BytesIO(image_bytes))
+        mime = detect_mime(image)
+        if not IMAGE_PREPROCESS:
+            STATS.record(len(image_bytes), len(image_bytes), True)
+            return bytes(image_bytes), mime
+
+        resized = max(image.size) > IMAGE_MAX_EDGE
+        rotated = image.getexif().get(0x0112, 1) != 1
+        # let the JPEG decoder downscale by a power of two while decoding
+        image.draft("L" if IMAGE_GRAYSCALE else "RGB", (IMAGE_MAX_EDGE, IMAGE_MAX_EDGE))
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((IMAGE_MAX_EDGE, IMAGE_MAX_EDGE), Image.LANCZOS)
+
+        if IMAGE_GRAYSCALE:
+            image = ImageOps.autocontrast(image.convert("L"), cutoff=1)
+        elif image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+    except (OSError, Image.DecompressionBombError) as e:
+        raise ValueError(f"unsupported or corrupt image: {e}") from e
+
+    out = io.BytesIO()
+    fmt = IMAGE_FORMAT if IMAGE_FORMAT in _MIME else "jpeg"
+    if fmt == "jpeg":
+        image.save(out, "JPEG", quality=IMAGE_QUALITY, optimize=True, progressive=True)
+    else:
+        image.save(out, "WEBP", quality=IMAGE_QUALITY, method=4)
+    encoded = out.getvalue()
+
+    # a small, upright image that is already well compressed can come out bigger
+    if not resized and not rotated and len(encoded) >= len(image_bytes):
+        STATS.record(len(image_bytes), len(image_bytes), True)
+        return bytes(image_bytes), mime
+
+    STATS.record(len(image_bytes), len(encoded), False)
+    return encoded, _MIME[fmt]
@@ -0,0 +1,183 @@
+"""Concurrency load test for /extract against a local OpenAI stub.
+
+Starts stub_openai.py with a fixed upstream latency, starts the OCR
+service (Flask dev server or gunicorn + gevent) pointed at it with the
+result cache disabled, then fires /extract requests at each concurrency
+level and reports throughput, latency percentiles, 429/503 counts and
+server RSS (Linux). --json writes the run info and results in the same
+layout as diseasePred/bench_suite.py so runs can be compared over time.
+
+    python loadtest_ocr.py --mode gevent --latency 1.0 --concurrency 1 8 32 64
+    python loadtest_ocr.py --latency 0.5 --json results/ocr.json
+"""
+import argparse
+import datetime
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+import stub_openai
+
+
+def sample_jpeg(size=(1200, 1600)):
+    image = Image.effect_noise(size, 64).convert("RGB")
+    out = io.BytesIO()
+    image.save(out, "JPEG", quality=85)
+    return out.getvalue()
+
+
+def multipart(image_bytes):
+    boundary = uuid.uuid4().hex
+    body = (
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="image"; filename="rx.jpg"\r\n'
+        "Content-Type: image/jpeg\r\n\r\n"
+    ).encode() + image_bytes + f"\r\n--{boundary}--\r\n".encode()
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+def post(url, body, content_type):
+    req = urllib.request.Request(url, data=body, headers={"Content-Type": content_type})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=120) as r:
+            r.read()
+            status = r.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    return status, time.perf_counter() - start
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def wait_up(base, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(base + "/", timeout=1).read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("OCR server did not start")
+
+
+def start_server(mode, port, stub_url, env_overrides):
+    env = dict(os.environ, PORT=str(port), OCR_BASE_URL=stub_url, GITHUB_API_KEY="stub",
+               OCR_CACHE_ENABLED="0", **env_overrides)
+    if mode == "dev":
+        cmd = [sys.executable, "test_server_pythonic.py"]
+    else:
+        cmd = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "test_server_pythonic:app"]
+    return subprocess.Popen(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def rss_mb(pid):
+    # server process plus its workers, from /proc
+    total_kb = 0
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            pids = [pid] + [int(p) for p in f.read().split()]
+        for p in pids:
+            with open(f"/proc/{p}/status") as f:
+                total_kb += next(int(line.split()[1]) for line in f if line.startswith("VmRSS:"))
+    except (OSError, StopIteration):
+        return None
+    return total_kb / 1024
+
+
+def run_info(args):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "suite": "ocr",
+        "started_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": commit or None,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "mode": args.mode,
+        "upstream_latency_seconds": args.latency,
+    }
+
+
+def run_level(url, body, content_type, concurrency, rounds):
+    n = concurrency * rounds
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(lambda _: post(url, body, content_type), range(n)))
+    elapsed = time.perf_counter() - start
+    ok = [t for status, t in results if status == 200]
+    return {
+        "name": "http_extract",
+        "concurrency": concurrency,
+        "requests": n,
+        "ok_per_sec": len(ok) / elapsed,
+        "p50_ms": percentile(ok, 0.50) * 1000 if ok else None,
+        "p95_ms": percentile(ok, 0.95) * 1000 if ok else None,
+        "p99_ms": percentile(ok, 0.99) * 1000 if ok else None,
+        "mean_ms": statistics.mean(ok) * 1000 if ok else None,
+        "statuses": dict(Counter(status for status, _ in results)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mode", choices=["dev", "gevent"], default="gevent")
+    parser.add_argument("--latency", type=float, default=1.0, help="stub upstream latency (s)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--rounds", type=int, default=3, help="requests per client")
+    parser.add_argument("--port", type=int, default=5099)
+    parser.add_argument("--max-inflight", default="32")
+    parser.add_argument("--max-queue", default="64")
+    parser.add_argument("--json", metavar="PATH", help="write run info and results as JSON")
+    args = parser.parse_args()
+
+    stub, stub_url = stub_openai.start(latency=args.latency)
+    server = start_server(args.mode, args.port, stub_url, {
+        "OCR_MAX_INFLIGHT": args.max_inflight, "OCR_MAX_QUEUE": args.max_queue,
+    })
+    base = f"http://127.0.0.1:{args.port}"
+    try:
+        wait_up(base)
+        body, content_type = multipart(sample_jpeg())
+        print(f"mode={args.mode} upstream latency={args.latency}s")
+        print(f"{'conc':>5} {'ok/s':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'rss':>7}  statuses")
+        results = []
+        for concurrency in args.concurrency:
+            r = run_level(base + "/extract", body, content_type, concurrency, args.rounds)
+            r["server_rss_mb"] = rss_mb(server.pid)
+            results.append(r)
+            fmt = lambda v: f"{v:7.0f}ms" if v is not None else "      n/a"
+            rss = f"{r['server_rss_mb']:5.0f}MB" if r["server_rss_mb"] is not None else "    n/a"
+            print(f"{r['concurrency']:>5} {r['ok_per_sec']:>8.2f} {fmt(r['p50_ms'])} "
+                  f"{fmt(r['p95_ms'])} {fmt(r['p99_ms'])} {rss}  {r['statuses']}")
+        if args.json:
+            os.makedirs(os.path.dirname(args.json) or ".", exist_ok=True)
+            with open(args.json, "w") as f:
+                json.dump({**run_info(args), "results": results}, f, indent=2)
+            print(f"results saved to {args.json}")
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+        stub.shutdown()
+
+
+if __name__ == "__main__":
+    main()
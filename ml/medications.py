@@ -0,0 +1,105 @@
+"""Parse and merge medication entries from the vision model's JSON answers."""
+import json
+import re
+
+FIELDS = ("medicine", "dosage", "frequency", "time")
+# keys the model tends to wrap the list in
+LIST_KEYS = ("prescriptions", "medications", "medicines", "prescription", "items")
+
+_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$", re.IGNORECASE)
+
+
+def strip_fences(content):
+    return _FENCE.sub("", content.strip())
+
+
+def parse_medications(content):
+    """Return the list of medication dicts in a model answer. Raises ValueError."""
+    data = json.loads(strip_fences(content))
+    if isinstance(data, dict):
+        for key in LIST_KEYS:
+            if isinstance(data.get(key), list):
+                data = data[key]
+                break
+        else:
+            data = [data]
+    if not isinstance(data, list):
+        raise ValueError("expected a list of medications")
+    return [entry for entry in data if isinstance(entry, dict) and entry.get("medicine")]
+
+
+def _norm(value):
+    if isinstance(value, list):
+        return tuple(sorted(_norm(v) for v in value))
+    return re.sub(r"\s+", " ", str(value or "").strip().lower())
+
+
+def merge_medications(pages):
+    """De-duplicate entries across pages on (medicine, dosage), keeping first-seen order.
+
+    Later pages only fill in fields the earlier entry left empty.
+    """
+    merged = {}
+    for entries in pages:
+        for entry in entries:
+            key = (_norm(entry.get("medicine")), _norm(entry.get("dosage")))
+            if key not in merged:
+                merged[key] = dict(entry)
+                continue
+            existing = merged[key]
+            for field in FIELDS:
+                if not existing.get(field) and entry.get(field):
+                    existing[field] = entry[field]
+    return list(merged.values())
+
+
+class MedicationStream:
+    """Incrementally pull complete medication objects out of a streamed JSON answer.
+
+    Tracks string/escape state and container nesting over the characters
+    seen so far; whenever an object that sits inside an array closes, it
+    is parsed on its own and returned from ``feed`` if it is a medication.
+    """
+
+    def __init__(self):
+        self.text = []
+        self._pos = 0
+        self._stack = []  # (char, start offset) per open container
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk):
+        found = []
+        for ch in chunk:
+            self.text.append(ch)
+            pos = self._pos
+            self._pos += 1
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "[{":
+                self._stack.append((ch, pos))
+            elif ch in "]}" and self._stack:
+                opener, start = self._stack.pop()
+                if ch == "}" and opener == "{" and self._stack and self._stack[-1][0] == "[":
+                    entry = self._parse("".join(self.text[start:pos + 1]))
+                    if entry is not None:
+                        found.append(entry)
+        return found
+
+    @staticmethod
+    def _parse(text):
+        try:
+            entry = json.loads(text)
+        except ValueError:
+            return None
+        return entry if isinstance(entry, dict) and entry.get("medicine") else None
+
+    def content(self):
+        return "".join(self.text)
@@ -0,0 +1,88 @@
+"""Content-addressed cache of OCR results, stored in SQLite.
+
+Extraction runs at temperature 0, so the same image, model and prompt
+always give the same answer. Results are keyed on a SHA-256 of all of
+them and evicted by age (TTL) and by count (least recently used first).
+"""
+import hashlib
+import sqlite3
+import threading
+import time
+
+
+def cache_key(image_bytes, *parts):
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(str(part).encode("utf-8"))
+        h.update(b"\0")
+    h.update(image_bytes)
+    return h.hexdigest()
+
+
+class OcrCache:
+    def __init__(self, path, max_entries=10000, ttl=30 * 24 * 3600.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS ocr_cache ("
+            " key TEXT PRIMARY KEY, result TEXT NOT NULL,"
+            " created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS ocr_cache_accessed ON ocr_cache (accessed)")
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT result, created FROM ocr_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                if row is not None:
+                    self._db.execute("DELETE FROM ocr_cache WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE ocr_cache SET accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def put(self, key, result):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO ocr_cache (key, result, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, result, now, now),
+            )
+            self._evict(now)
+
+    def _evict(self, now):
+        cur = self._db.execute("DELETE FROM ocr_cache WHERE created < ?", (now - self.ttl,))
+        self.evictions += cur.rowcount
+        (count,) = self._db.execute("SELECT COUNT(*) FROM ocr_cache").fetchone()
+        if count > self.max_entries:
+            cur = self._db.execute(
+                "DELETE FROM ocr_cache WHERE key IN"
+                " (SELECT key FROM ocr_cache ORDER BY accessed LIMIT ?)",
+                (count - self.max_entries,),
+            )
+            self.evictions += cur.rowcount
+
+    def stats(self):
+        with self._lock:
+            (count,) = self._db.execute("SELECT COUNT(*) FROM ocr_cache").fetchone()
+        total = self.hits + self.misses
+        return {
+            "entries": count,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
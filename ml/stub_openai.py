@@ -0,0 +1,94 @@
+"""Local stand-in for an OpenAI-compatible chat completions endpoint.
+
+Answers POST /chat/completions after a configurable delay with a fixed
+prescription JSON (streamed as SSE chunks when the request sets stream), so the OCR service can be load-tested without
+calling the real model. Point the server at it with
+OCR_BASE_URL=http://127.0.0.1:<port>.
+
+    python stub_openai.py --port 8089 --latency 1.5
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RESULT = json.dumps([
+    {"medicine": "Paracetamol", "dosage": "500 mg", "frequency": "twice a day", "time": ["08:00", "20:00"]},
+    {"medicine": "Amoxicillin", "dosage": "250 mg", "frequency": "three times a day", "time": ["08:00", "14:00", "20:00"]},
+])
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    latency = 1.0
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        request = json.loads(body or b"{}")
+        if request.get("stream"):
+            return self.stream(request)
+        time.sleep(self.latency)
+        payload = json.dumps({
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": RESULT},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def stream(self, request, pieces=8):
+        # spread the latency over the answer, streamed in a few deltas as SSE
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        step = -(-len(RESULT) // pieces)
+        for i in range(0, len(RESULT), step):
+            time.sleep(self.latency / pieces)
+            chunk = {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": request.get("model", "stub"),
+                "choices": [{"index": 0, "delta": {"content": RESULT[i:i + step]}, "finish_reason": None}],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.close_connection = True
+
+
+def start(port=0, latency=1.0):
+    """Start the stub in a background thread; returns (server, base_url)."""
+    handler = type("Handler", (StubHandler,), {"latency": latency})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=1.0)
+    args = parser.parse_args()
+    server, url = start(args.port, args.latency)
+    print(f"stub listening on {url} (latency {args.latency}s)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
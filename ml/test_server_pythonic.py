@@ -1,68 +1,355 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Request, Response, request, jsonify, stream_with_context
+import json
 from flask_cors import CORS
 import base64
+import io
 import os
-import tempfile
-from werkzeug.utils import secure_filename
+import httpx
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.exceptions import RequestEntityTooLarge
 from openai import OpenAI
+import image_preprocess
+from image_preprocess import STATS as IMAGE_STATS, prepare_image
+from ocr_cache import OcrCache, cache_key
+from upstream_limit import Overloaded, UpstreamLimiter
+from medications import MedicationStream, merge_medications, parse_medications
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# uploads larger than this are rejected with 413
+MAX_IMAGE_BYTES = int(os.getenv("MAX_IMAGE_BYTES", str(10 * 1024 * 1024)))
+# pages accepted by /extract/batch
+MAX_BATCH_IMAGES = int(os.getenv("MAX_BATCH_IMAGES", "8"))
+# /extract/batch packs pages into one model call when they fit under both limits
+OCR_PACK_MAX_IMAGES = int(os.getenv("OCR_PACK_MAX_IMAGES", "4"))
+OCR_PACK_MAX_BYTES = int(os.getenv("OCR_PACK_MAX_BYTES", str(4 * 1024 * 1024)))
+
+
+# single-image uploads: one image plus the multipart boundaries and form fields
+MAX_CONTENT_LENGTH = MAX_IMAGE_BYTES + 64 * 1024
+# /extract/batch only: room for a full batch; each image is still checked against MAX_IMAGE_BYTES
+MAX_BATCH_CONTENT_LENGTH = MAX_BATCH_IMAGES * MAX_IMAGE_BYTES + 64 * 1024
+
+
+class InMemoryRequest(Request):
+    # keep multipart uploads in memory instead of werkzeug's spooled temp files;
+    # max_content_length bounds how much can be buffered
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return io.BytesIO()
+
+    @property
+    def max_content_length(self):
+        # the route is matched before the body is read, so only the batch
+        # endpoint gets the larger limit
+        if self.endpoint == "extract_batch":
+            return MAX_BATCH_CONTENT_LENGTH
+        return MAX_CONTENT_LENGTH
+
+
 app = Flask(__name__)
+app.request_class = InMemoryRequest
+app.config["MAX_CONTENT_LENGTH"] = MAX_CONTENT_LENGTH
 CORS(app, resources={r"/*": {"origins": ["https://medic-reminder-two.vercel.app", "https://medicreminder-production-aaca.up.railway.app","https://medicreminder-production-0f69.up.railway.app"]}}, supports_credentials=True)
 
 github_api_key = os.getenv("GITHUB_API_KEY")
 
-# Authenticate with GitHub Models API
+# bound in-flight vision calls; excess requests wait briefly, then get 429/503
+OCR_MAX_INFLIGHT = int(os.getenv("OCR_MAX_INFLIGHT", "8"))
+limiter = UpstreamLimiter(
+    max_inflight=OCR_MAX_INFLIGHT,
+    max_queue=int(os.getenv("OCR_MAX_QUEUE", "32")),
+    queue_timeout=float(os.getenv("OCR_QUEUE_TIMEOUT", "10")),
+)
+
+# Authenticate with GitHub Models API; one pooled HTTP client shared by every request
 client = OpenAI(
-    base_url="https://models.github.ai/inference",
+    base_url=os.getenv("OCR_BASE_URL", "https://models.github.ai/inference"),
     api_key=github_api_key,
+    http_client=httpx.Client(
+        limits=httpx.Limits(max_connections=OCR_MAX_INFLIGHT, max_keepalive_connections=OCR_MAX_INFLIGHT),
+        timeout=httpx.Timeout(float(os.getenv("OCR_UPSTREAM_TIMEOUT", "60")), connect=5.0),
+    ),
 )
 
-def encode_image(image_path):
-    with open(image_path, "rb") as f:
-        return base64.b64encode(f.read()).decode("utf-8")
+OCR_MODEL = os.getenv("OCR_MODEL", "openai/gpt-4o")
+SYSTEM_PROMPT = "You are a medical OCR assistant. Extract prescriptions from images and return structured JSON with medicine, dosage, frequency, and time."
+USER_PROMPT = "Extract prescription details from this image."
+PACKED_PROMPT = "These images are pages of the same prescription. Extract prescription details from all of them as one JSON list."
+
+# content-addressed cache of OCR results (temperature=0, so repeats are identical)
+OCR_CACHE_ENABLED = os.getenv("OCR_CACHE_ENABLED", "1") == "1"
+ocr_cache = OcrCache(
+    os.getenv("OCR_CACHE_PATH", "ocr_cache.sqlite3"),
+    max_entries=int(os.getenv("OCR_CACHE_MAX_ENTRIES", "10000")),
+    ttl=float(os.getenv("OCR_CACHE_TTL", str(30 * 24 * 3600))),
+) if OCR_CACHE_ENABLED else None
+
+# preprocessing settings change the bytes the model sees, so they are part of the key
+PREPROCESS_SIGNATURE = (
+    image_preprocess.IMAGE_PREPROCESS, image_preprocess.IMAGE_MAX_EDGE,
+    image_preprocess.IMAGE_GRAYSCALE, image_preprocess.IMAGE_FORMAT, image_preprocess.IMAGE_QUALITY,
+)
+
+def read_image(image_file):
+    # zero-copy view of the in-memory upload
+    stream = image_file.stream
+    if isinstance(stream, io.BytesIO):
+        return stream.getbuffer()
+    return stream.read(MAX_IMAGE_BYTES + 1)
+
+def encode_image(image_bytes):
+    return base64.b64encode(image_bytes).decode("ascii")
 
 @app.route('/',methods=["GET"])
 def home():
     return "<h1>Hello, this is Flask Pythonic Backend responding</h1>"
 
-@app.route('/extract', methods=['POST'])
-def extract():
-    try:
-        # Expecting multipart/form-data with field 'image'
-        if 'image' not in request.files:
-            return jsonify({"error": "image file is required"}), 400
-        image_file = request.files['image']
-        temp_dir = tempfile.gettempdir()
-        filename = secure_filename(image_file.filename or 'upload.jpg')
-        tmp_path = os.path.join(temp_dir, filename)
-        image_file.save(tmp_path)
-        base64_image = encode_image(tmp_path)
+def image_part(image_bytes, mime):
+    return {
+        "type": "image_url",
+        "image_url": {
+            "url": f"data:{mime};base64,{encode_image(image_bytes)}"
+        }
+    }
 
+def call_model(prompt, images):
+    # images: list of (bytes, mime); one chat completion for all of them
+    with limiter.slot():
         response = client.chat.completions.create(
-            model="openai/gpt-4o",
+            model=OCR_MODEL,
             messages=[
-                {"role": "system", "content": "You are a medical OCR assistant. Extract prescriptions from images and return structured JSON with medicine, dosage, frequency, and time."},
+                {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": [
-                    {"type": "text", "text": "Extract prescription details from this image."},
-                    {
-                        "type": "image_url",
-                        "image_url": {
-                            "url": f"data:image/jpeg;base64,{base64_image}"
-                        }
-                    }
+                    {"type": "text", "text": prompt},
+                    *[image_part(data, mime) for data, mime in images],
                 ]}
             ],
             temperature=0
         )
+    return response.choices[0].message.content
+
+def check_image(image_bytes):
+    if len(image_bytes) > MAX_IMAGE_BYTES:
+        return jsonify({"error": f"image must be at most {MAX_IMAGE_BYTES} bytes"}), 413
+    if len(image_bytes) == 0:
+        return jsonify({"error": "image file is empty"}), 400
+    return None
+
+def extract_image(image_bytes):
+    """OCR one image, going through the result cache. Returns (content, cached)."""
+    key = cache_key(image_bytes, OCR_MODEL, SYSTEM_PROMPT, USER_PROMPT, PREPROCESS_SIGNATURE)
+    if ocr_cache:
+        cached = ocr_cache.get(key)
+        if cached is not None:
+            return cached, True
+
+    content = call_model(USER_PROMPT, [prepare_image(image_bytes)])
+    if ocr_cache and content:
+        ocr_cache.put(key, content)
+    return content, False
+
+@app.route('/extract', methods=['POST'])
+def extract():
+    try:
+        # Expecting multipart/form-data with field 'image'
+        if 'image' not in request.files:
+            return jsonify({"error": "image file is required"}), 400
+        image_bytes = read_image(request.files['image'])
+        error = check_image(image_bytes)
+        if error:
+            return error
 
-        content = response.choices[0].message.content
-        return jsonify({"result": content})
+        try:
+            content, cached = extract_image(image_bytes)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify({"result": content, "cached": cached})
+    except Overloaded as e:
+        return jsonify({"error": str(e)}), e.status, {"Retry-After": "1"}
+    except RequestEntityTooLarge:
+        return jsonify({"error": f"image must be at most {MAX_IMAGE_BYTES} bytes"}), 413
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def extract_pages_parallel(pages):
+    # one model call per page, all in flight at once (bounded by the limiter)
+    def run(image_bytes):
+        try:
+            content, cached = extract_image(image_bytes)
+            return {"result": content, "cached": cached}
+        except Overloaded:
+            raise
+        except Exception as e:
+            return {"error": str(e)}
+
+    with ThreadPoolExecutor(max_workers=len(pages)) as pool:
+        return list(pool.map(run, pages))
+
+def extract_pages_packed(pages):
+    # a single model call carrying every page
+    images = [prepare_image(image_bytes) for image_bytes in pages]
+    content = call_model(PACKED_PROMPT, images)
+    return [{"result": content, "cached": False, "pages": list(range(len(pages)))}]
+
+@app.route('/extract/batch', methods=['POST'])
+def extract_batch():
+    try:
+        # Expecting multipart/form-data with one or more 'images' fields
+        files = request.files.getlist('images')
+        if not files:
+            return jsonify({"error": "at least one file in 'images' is required"}), 400
+        if len(files) > MAX_BATCH_IMAGES:
+            return jsonify({"error": f"at most {MAX_BATCH_IMAGES} images per batch"}), 413
+        pages = [read_image(f) for f in files]
+        for image_bytes in pages:
+            error = check_image(image_bytes)
+            if error:
+                return error
+
+        # auto packs small batches into one call, otherwise pages run concurrently
+        mode = request.form.get('mode', 'auto')
+        if mode not in ('auto', 'parallel', 'pack'):
+            return jsonify({"error": "mode must be auto, parallel or pack"}), 400
+        fits = len(pages) <= OCR_PACK_MAX_IMAGES and sum(len(p) for p in pages) <= OCR_PACK_MAX_BYTES
+        packed = len(pages) > 1 and (mode == 'pack' or (mode == 'auto' and fits))
+
+        try:
+            results = extract_pages_packed(pages) if packed else extract_pages_parallel(pages)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        parsed, errors = [], []
+        for i, r in enumerate(results):
+            if "error" in r:
+                errors.append({"page": i, "error": r["error"]})
+                continue
+            try:
+                parsed.append(parse_medications(r["result"]))
+            except ValueError as e:
+                errors.append({"page": i, "error": f"could not parse model output: {e}", "raw": r["result"]})
+
+        return jsonify({
+            "medications": merge_medications(parsed),
+            "pages": len(pages),
+            "packed": packed,
+            "errors": errors,
+        })
+    except Overloaded as e:
+        return jsonify({"error": str(e)}), e.status, {"Retry-After": "1"}
+    except RequestEntityTooLarge:
+        return jsonify({"error": "batch upload too large"}), 413
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+def stream_model(prompt, image):
+    # yields text deltas of a streamed completion
+    stream = client.chat.completions.create(
+        model=OCR_MODEL,
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": [
+                {"type": "text", "text": prompt},
+                image_part(*image),
+            ]}
+        ],
+        temperature=0,
+        stream=True
+    )
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+def stream_events(image_bytes, key, cached, release):
+    """Yield medication events as they complete, then a final validated result.
+
+    ``release`` frees the upstream limiter slot once the model stream ends.
+    """
+    parser = MedicationStream()
+    try:
+        if cached is not None:
+            for entry in parser.feed(cached):
+                yield {"type": "medication", "data": entry}
+        else:
+            for delta in stream_model(USER_PROMPT, prepare_image(image_bytes)):
+                for entry in parser.feed(delta):
+                    yield {"type": "medication", "data": entry}
+    except Exception as e:
+        yield {"type": "error", "error": str(e)}
+        return
+    finally:
+        release()
+
+    content = parser.content()
+    try:
+        medications = parse_medications(content)
+    except ValueError as e:
+        yield {"type": "error", "error": f"could not parse model output: {e}", "raw": content}
+        return
+    if ocr_cache and cached is None and content:
+        ocr_cache.put(key, content)
+    yield {"type": "done", "medications": medications, "cached": cached is not None}
+
+@app.route('/extract/stream', methods=['POST'])
+def extract_stream():
+    # NDJSON by default; Server-Sent Events when the client accepts text/event-stream
+    try:
+        if 'image' not in request.files:
+            return jsonify({"error": "image file is required"}), 400
+        # copy out of the request buffer, which is released once the response starts
+        image_bytes = bytes(read_image(request.files['image']))
+        error = check_image(image_bytes)
+        if error:
+            return error
+    except RequestEntityTooLarge:
+        return jsonify({"error": f"image must be at most {MAX_IMAGE_BYTES} bytes"}), 413
+
+    key = cache_key(image_bytes, OCR_MODEL, SYSTEM_PROMPT, USER_PROMPT, PREPROCESS_SIGNATURE)
+    cached = ocr_cache.get(key) if ocr_cache else None
+    slot = None
+    if cached is None:
+        # take the upstream slot before the response starts, so overload is still a 429/503
+        slot = limiter.slot()
+        try:
+            slot.__enter__()
+        except Overloaded as e:
+            return jsonify({"error": str(e)}), e.status, {"Retry-After": "1"}
+
+    def release():
+        # runs at the end of the stream and again when the response closes;
+        # the second call is a no-op
+        nonlocal slot
+        if slot is not None:
+            slot, held = None, slot
+            held.__exit__(None, None, None)
+
+    sse = request.accept_mimetypes.best_match(["application/x-ndjson", "text/event-stream"]) == "text/event-stream"
+
+    def generate():
+        for event in stream_events(image_bytes, key, cached, release):
+            line = json.dumps(event)
+            yield f"data: {line}\n\n" if sse else line + "\n"
+
+    mimetype = "text/event-stream" if sse else "application/x-ndjson"
+    response = Response(stream_with_context(generate()), mimetype=mimetype, headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    # also covers a client that disconnects before the stream starts
+    response.call_on_close(release)
+    return response
+
+@app.route('/metrics/images', methods=['GET'])
+def image_metrics():
+    return jsonify(IMAGE_STATS.snapshot())
+
+@app.route('/metrics/ocr-cache', methods=['GET'])
+def ocr_cache_metrics():
+    if not ocr_cache:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, **ocr_cache.stats()})
+
+@app.route('/metrics/upstream', methods=['GET'])
+def upstream_metrics():
+    return jsonify(limiter.stats())
+
 if __name__ == '__main__':
-    port=5000
+    port=int(os.getenv("PORT", "5000"))
     app.run(host='0.0.0.0',port=port)
@@ -0,0 +1,75 @@
+"""Bound the number of in-flight calls to the vision model.
+
+At most ``max_inflight`` callers hold a slot at once. Up to ``max_queue``
+more may wait, each for at most ``queue_timeout`` seconds. Anyone beyond
+that fails fast with ``Overloaded`` instead of piling up behind a slow
+upstream. Uses ``threading`` primitives, which gevent monkey-patches
+into cooperative ones under the gevent worker.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+
+class Overloaded(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class UpstreamLimiter:
+    def __init__(self, max_inflight=8, max_queue=32, queue_timeout=10.0):
+        self.max_inflight = max_inflight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max_inflight)
+        self._lock = threading.Lock()
+        self.inflight = 0
+        self.waiting = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self.completed = 0
+        self.wait_total = 0.0
+
+    @contextmanager
+    def slot(self):
+        start = time.monotonic()
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                if self.waiting >= self.max_queue:
+                    self.rejected_queue_full += 1
+                    raise Overloaded(429, "too many pending OCR requests, retry shortly")
+                self.waiting += 1
+            try:
+                acquired = self._slots.acquire(timeout=self.queue_timeout)
+            finally:
+                with self._lock:
+                    self.waiting -= 1
+            if not acquired:
+                with self._lock:
+                    self.rejected_timeout += 1
+                raise Overloaded(503, "OCR service busy, timed out waiting for a slot")
+
+        with self._lock:
+            self.inflight += 1
+            self.wait_total += time.monotonic() - start
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.inflight -= 1
+                self.completed += 1
+            self._slots.release()
+
+    def stats(self):
+        return {
+            "max_inflight": self.max_inflight,
+            "max_queue": self.max_queue,
+            "queue_timeout_seconds": self.queue_timeout,
+            "inflight": self.inflight,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+            "mean_wait_ms": self.wait_total / self.completed * 1000.0 if self.completed else 0.0,
+        }